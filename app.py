@@ -2,13 +2,19 @@ import subprocess
 import sys
 import os
 
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend')
+
 def start_backend():
     """Start the FastAPI backend server"""
     try:
         print("Starting FastAPI backend...")
-        # Change to backend directory and start the server
-        os.chdir('backend')
-        subprocess.run([sys.executable, 'main.py'], check=True)
+        # Run the server from the backend directory without changing ours
+        subprocess.run(
+            [sys.executable, 'main.py'],
+            cwd=BACKEND_DIR,
+            env={**os.environ, "PYTHONUNBUFFERED": "1"},
+            check=True
+        )
     except subprocess.CalledProcessError as e:
         print(f"Error starting backend: {e}")
     except Exception as e:
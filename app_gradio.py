@@ -4,24 +4,46 @@ import sys
 import os
 import requests
 import json
+import time
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend')
+
+# Reuse one connection pool for backend probes
+_http = requests.Session()
+
+# Last status probe as (monotonic time, result); clicks within the TTL reuse it
+STATUS_TTL = 1.0
+_status_cache = (float("-inf"), None)
 
 def start_backend():
     """Start the FastAPI backend server"""
     try:
         print("Starting FastAPI backend...")
-        os.chdir('backend')
-        process = subprocess.Popen([sys.executable, 'main.py'])
+        process = subprocess.Popen(
+            [sys.executable, 'main.py'],
+            cwd=BACKEND_DIR,
+            env={**os.environ, "PYTHONUNBUFFERED": "1"}
+        )
         return process
     except Exception as e:
         return f"Error starting backend: {e}"
 
 def get_backend_status():
     """Check if backend is running"""
+    global _status_cache
+    checked_at, status = _status_cache
+    now = time.monotonic()
+    if now - checked_at < STATUS_TTL:
+        return status
+    
     try:
-        response = requests.get("http://localhost:8000/", timeout=5)
-        return "✅ Backend is running" if response.status_code == 200 else "❌ Backend not responding"
+        response = _http.get("http://localhost:8000/", timeout=5)
+        status = "✅ Backend is running" if response.status_code == 200 else "❌ Backend not responding"
     except:
-        return "❌ Backend not running"
+        status = "❌ Backend not running"
+    
+    _status_cache = (time.monotonic(), status)
+    return status
 
 def create_interface():
     """Create Gradio interface for ArchaeoScan"""
@@ -1,19 +1,84 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 import os
+import orjson
 
 # Database configuration
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./archaeoscan.db")
 
+# Connections kept open per engine on server databases; overflow allows twice as many again
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "20"))
+
+def _pool_options(url: str) -> dict:
+    """Pool settings for the engine behind the given URL"""
+    if url.startswith("sqlite"):
+        if url.endswith(":memory:") or url.endswith("://"):
+            # Every connection to an in-memory database is a new database, so share one
+            return {"poolclass": StaticPool}
+        # File databases keep SQLAlchemy's default pool
+        return {}
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_POOL_SIZE * 2,
+        "pool_recycle": 1800,  # Recycle before server-side idle timeouts close connections
+        "pool_timeout": 5  # Fail fast instead of queueing requests behind an exhausted pool
+    }
+
+def _json_serializer(value) -> str:
+    """Encode JSON columns with orjson, accepting NumPy values and non-string keys like json does"""
+    return orjson.dumps(value, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS).decode()
+
 engine = create_engine(
     DATABASE_URL, 
     connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {},
-    pool_pre_ping=True  # Verify connections before use
+    pool_pre_ping=True,  # Verify connections before use
+    json_serializer=_json_serializer,
+    json_deserializer=orjson.loads,
+    **_pool_options(DATABASE_URL)
+)
+
+# SQLite tuning applied to every new connection: WAL lets readers run alongside the
+# writer, and NORMAL sync is durable in WAL mode except on power loss
+_SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",  # 256 MiB
+    "PRAGMA cache_size=-65536"  # 64 MiB
 )
 
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    for pragma in _SQLITE_PRAGMAS:
+        cursor.execute(pragma)
+    cursor.close()
+
+if DATABASE_URL.startswith("sqlite"):
+    event.listen(engine, "connect", _set_sqlite_pragmas)
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine on the same database for endpoints that await their queries
+ASYNC_DATABASE_URL = DATABASE_URL \
+    .replace("sqlite://", "sqlite+aiosqlite://", 1) \
+    .replace("postgresql://", "postgresql+asyncpg://", 1)
+
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    pool_pre_ping=True,
+    json_serializer=_json_serializer,
+    json_deserializer=orjson.loads,
+    **_pool_options(ASYNC_DATABASE_URL)
+)
+
+if DATABASE_URL.startswith("sqlite"):
+    event.listen(async_engine.sync_engine, "connect", _set_sqlite_pragmas)
+
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
 
 def get_db():
@@ -26,10 +91,29 @@ def get_db():
     finally:
         db.close()
 
+async def get_async_db():
+    """
+    Dependency to get an async database session
+    """
+    async with AsyncSessionLocal() as session:
+        yield session
+
 def init_db():
     """
     Initialize the database tables
     """
     # Import all models to register them with Base metadata
     from models import Base  # This imports all models through __init__.py
-    Base.metadata.create_all(bind=engine)
\ No newline at end of file
+    from app import models as app_models
+    if engine.dialect.name == "postgresql":
+        # Trigram operator class for the artifacts material index
+        with engine.begin() as conn:
+            conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    Base.metadata.create_all(bind=engine)
+    app_models.Base.metadata.create_all(bind=engine)
+    
+    # create_all() skips indexes on tables that already exist, so add any new ones
+    for metadata in (Base.metadata, app_models.Base.metadata):
+        for table in metadata.tables.values():
+            for index in table.indexes:
+                index.create(bind=engine, checkfirst=True)
\ No newline at end of file
@@ -1,9 +1,12 @@
 from fastapi import APIRouter, Depends, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
+from datetime import datetime
 from pydantic import BaseModel
-import json
-from models import get_db
+import asyncio
+import orjson
+from models import get_db, SessionLocal
 from models.database_models import Settings
 from routers.services.ml_analysis_service import ml_analysis_service
 from routers.services.notifications_service import notifications_service
@@ -33,27 +36,41 @@ class TrendAnalysisResponse(BaseModel):
     trends: Dict[str, str]
     statistics: Dict[str, float]
 
+# (sensor data watermark, records) of the last /train-model run, to skip retraining on unchanged data
+_last_manual_training: Optional[Tuple[int, int]] = None
+
+# Serializes first-use training so concurrent requests train the model only once
+_training_lock = asyncio.Lock()
+
+async def _train_from_history(db: Session):
+    """
+    Train the preservation model on recent sensor data, off the event loop
+    """
+    async with _training_lock:
+        if ml_analysis_service.is_trained:
+            return
+        historical_data = await asyncio.to_thread(get_db_service(db).get_recent_sensor_data, 50)
+        if historical_data:
+            await asyncio.to_thread(ml_analysis_service.train_model, historical_data)
+
 @router.post("/analyze-preservation", response_model=Dict[str, Any])
 async def analyze_preservation(data: SensorReadingForAnalysis, db: Session = Depends(get_db)):
     """
     Advanced AI/ML analysis of preservation based on sensor data
     """
     # Train the model with historical data if not already trained
-    db_service = get_db_service(db)
-    historical_data = db_service.get_recent_sensor_data(limit=50)
-    
-    if historical_data and not ml_analysis_service.is_trained:
-        ml_analysis_service.train_model(historical_data)
+    if not ml_analysis_service.is_trained:
+        await _train_from_history(db)
     
     # Perform prediction
-    sensor_dict = data.dict()
+    sensor_dict = data.model_dump()
     prediction = ml_analysis_service.predict_preservation(sensor_dict)
     
     return {
         "prediction": prediction,
         "analysis": {
             "is_ml_prediction": ml_analysis_service.is_trained,
-            "training_samples_used": len(historical_data) if historical_data else 0
+            "training_samples_used": ml_analysis_service.last_train_size
         }
     }
 
@@ -62,7 +79,7 @@ async def compare_materials(data: SensorReadingForAnalysis, db: Session = Depend
     """
     Compare preservation across different materials based on current conditions
     """
-    sensor_dict = data.dict()
+    sensor_dict = data.model_dump()
     comparison = ml_analysis_service.compare_materials(sensor_dict)
     
     return comparison
@@ -73,11 +90,12 @@ async def trend_analysis(db: Session = Depends(get_db)):
     Analyze historical trends in sensor data
     """
     db_service = get_db_service(db)
-    historical_data = db_service.get_recent_sensor_data(limit=100)
     
-    analysis = ml_analysis_service.generate_trend_analysis(historical_data)
-    
-    return analysis
+    # Repeat polls are served from memory until any process stores new sensor data
+    return ml_analysis_service.get_trend_analysis(
+        db_service.get_sensor_data_watermark(),
+        lambda: db_service.get_recent_sensor_data(limit=100)
+    )
 
 @router.websocket("/notifications")
 async def websocket_notifications(websocket: WebSocket):
@@ -117,15 +135,11 @@ async def filter_artifacts(
     """
     Filter artifacts based on various criteria
     """
-    from datetime import datetime
-    
     # Parse date strings if provided
-    from datetime import datetime as dt
-    parsed_date_from = dt.fromisoformat(date_from) if date_from else None
-    parsed_date_to = dt.fromisoformat(date_to) if date_to else None
+    parsed_date_from = datetime.fromisoformat(date_from) if date_from else None
+    parsed_date_to = datetime.fromisoformat(date_to) if date_to else None
     
-    catalog_service = get_catalog_service(db)
-    artifacts = catalog_service.get_artifacts_filtered(
+    filters = dict(
         material=material,
         preservation_min=preservation_min,
         preservation_max=preservation_max,
@@ -133,16 +147,61 @@ async def filter_artifacts(
         date_to=parsed_date_to,
         latitude=latitude,
         longitude=longitude,
-        radius_km=radius_km,
-        limit=limit,
-        offset=offset
+        radius_km=radius_km
     )
     
+    catalog_service = get_catalog_service(db)
+    artifacts = catalog_service.get_artifacts_filtered(limit=limit, offset=offset, **filters)
+    
+    # Total across all pages, not just the rows returned here
     return {
         "artifacts": artifacts,
-        "total_count": len(artifacts)
+        "total_count": catalog_service.count_artifacts_filtered(**filters)
     }
 
+@router.get("/catalog/filter/stream")
+def stream_filtered_artifacts(
+    material: str = None,
+    preservation_min: float = None,
+    preservation_max: float = None,
+    date_from: str = None,
+    date_to: str = None,
+    latitude: float = None,
+    longitude: float = None,
+    radius_km: float = None,
+    limit: Optional[int] = None,
+    offset: int = 0
+):
+    """
+    Stream filtered artifacts as NDJSON, one artifact per line, without a default limit.
+    Rows are read from the database in batches while the response is being sent.
+    """
+    parsed_date_from = datetime.fromisoformat(date_from) if date_from else None
+    parsed_date_to = datetime.fromisoformat(date_to) if date_to else None
+    
+    def line_iter():
+        # The response outlives request dependencies, so the stream owns its session
+        session = SessionLocal()
+        try:
+            artifacts = get_catalog_service(session).iter_artifacts_filtered(
+                material=material,
+                preservation_min=preservation_min,
+                preservation_max=preservation_max,
+                date_from=parsed_date_from,
+                date_to=parsed_date_to,
+                latitude=latitude,
+                longitude=longitude,
+                radius_km=radius_km,
+                limit=limit,
+                offset=offset
+            )
+            for artifact in artifacts:
+                yield orjson.dumps(artifact) + b"\n"
+        finally:
+            session.close()
+    
+    return StreamingResponse(line_iter(), media_type="application/x-ndjson")
+
 @router.get("/catalog/statistics")
 async def get_catalog_statistics(db: Session = Depends(get_db)):
     """
@@ -168,13 +227,25 @@ async def train_ml_model(db: Session = Depends(get_db)):
     """
     Manually trigger training of the ML model with historical data
     """
+    global _last_manual_training
+    
     db_service = get_db_service(db)
+    
+    # Retraining on an unchanged history would produce the same model
+    watermark = db_service.get_sensor_data_watermark()
+    if ml_analysis_service.is_trained and _last_manual_training and _last_manual_training[0] == watermark:
+        return {
+            "message": f"Model trained successfully with {_last_manual_training[1]} samples",
+            "is_trained": True
+        }
+    
     historical_data = db_service.get_recent_sensor_data(limit=100)
     
     if not historical_data:
         return {"message": "No historical data available for training"}
     
     ml_analysis_service.train_model(historical_data)
+    _last_manual_training = (watermark, len(historical_data))
     
     return {
         "message": f"Model trained successfully with {len(historical_data)} samples",
@@ -1,11 +1,42 @@
 from fastapi import APIRouter
 from pydantic import BaseModel
 from typing import List, Optional
-import random
+import math
+import numpy as np
 import time
 
 router = APIRouter()
 
+# Random source for the simulated analysis
+_rng = np.random.default_rng()
+
+# Simulated material types and their probability weights
+_MATERIAL_TYPES = ("ceramic", "metal", "stone", "organic", "unknown")
+_MATERIAL_CUM_WEIGHTS = np.cumsum([0.3, 0.25, 0.2, 0.15, 0.1])[:-1]
+
+# Top 3 characteristics reported for each material type
+_CHARACTERISTICS = {
+    "ceramic": ("smooth surface", "uniform color", "symmetrical shape"),
+    "metal": ("magnetic signature", "corrosion patterns", "metallic luster"),
+    "stone": ("rough texture", "natural formation", "high hardness"),
+    "organic": ("fibrous structure", "low density", "decomposition signs"),
+    "unknown": ("unknown composition", "unusual properties", "requires further analysis"),
+}
+
+# Water grades checked in order: turbidity below the limit (NTU), temperature (Celsius)
+# and pH within range; water matching none of them is poor
+_WATER_GRADES = (
+    (10, 18, 22, 7.0, 8.0, "excellent", "Clear water with optimal temperature and pH"),
+    (25, 15, 25, 6.5, 8.5, "good", "Moderate water conditions"),
+    (40, -math.inf, math.inf, -math.inf, math.inf, "fair", "High turbidity affecting visibility"),
+)
+_POOR_WATER = ("poor", "Very high turbidity and suboptimal conditions")
+
+# Bounds for one draw per request: turbidity (NTU), temperature (Celsius),
+# pH, material confidence and the material pick
+_DRAW_LOW = np.array([5.0, 15.0, 6.5, 0.6, 0.0])
+_DRAW_HIGH = np.array([50.0, 25.0, 8.5, 0.95, 1.0])
+
 class WaterAnalysis(BaseModel):
     preservation: str  # excellent, good, fair, poor
     reason: str
@@ -27,43 +58,18 @@ class AIAnalysisResponse(BaseModel):
 async def analyze_current_data():
     """Analyze current water conditions and material identification"""
     
-    # Simulate water analysis
-    turbidity = random.uniform(5.0, 50.0)  # NTU
-    temperature = random.uniform(15.0, 25.0)  # Celsius
-    ph = random.uniform(6.5, 8.5)
+    # Simulate water and material analysis with a single draw
+    turbidity, temperature, ph, confidence, pick = _rng.uniform(_DRAW_LOW, _DRAW_HIGH).tolist()
     
-    # Determine preservation based on water quality
-    if turbidity < 10 and 18 <= temperature <= 22 and 7.0 <= ph <= 8.0:
-        preservation = "excellent"
-        reason = "Clear water with optimal temperature and pH"
-    elif turbidity < 25 and 15 <= temperature <= 25 and 6.5 <= ph <= 8.5:
-        preservation = "good"
-        reason = "Moderate water conditions"
-    elif turbidity < 40:
-        preservation = "fair"
-        reason = "High turbidity affecting visibility"
+    # Determine preservation based on water quality: first matching grade wins
+    for max_turbidity, min_temp, max_temp, min_ph, max_ph, preservation, reason in _WATER_GRADES:
+        if turbidity < max_turbidity and min_temp <= temperature <= max_temp and min_ph <= ph <= max_ph:
+            break
     else:
-        preservation = "poor"
-        reason = "Very high turbidity and suboptimal conditions"
+        preservation, reason = _POOR_WATER
     
     # Simulate material analysis
-    material_types = ["ceramic", "metal", "stone", "organic", "unknown"]
-    weights = [0.3, 0.25, 0.2, 0.15, 0.1]  # Probability weights
-    material_type = random.choices(material_types, weights=weights)[0]
-    confidence = random.uniform(0.6, 0.95)
-    
-    # Generate characteristics based on material type
-    characteristics = []
-    if material_type == "ceramic":
-        characteristics = ["smooth surface", "uniform color", "symmetrical shape", "high density"]
-    elif material_type == "metal":
-        characteristics = ["magnetic signature", "corrosion patterns", "metallic luster", "irregular shape"]
-    elif material_type == "stone":
-        characteristics = ["rough texture", "natural formation", "high hardness", "weathered surface"]
-    elif material_type == "organic":
-        characteristics = ["fibrous structure", "low density", "decomposition signs", "biological origin"]
-    else:
-        characteristics = ["unknown composition", "unusual properties", "requires further analysis"]
+    material_type = _MATERIAL_TYPES[int(np.searchsorted(_MATERIAL_CUM_WEIGHTS, pick, side="right"))]
     
     return {
         "water": {
@@ -76,7 +82,7 @@ async def analyze_current_data():
         "material": {
             "type": material_type,
             "confidence": round(confidence, 2),
-            "characteristics": characteristics[:3]  # Return top 3 characteristics
+            "characteristics": list(_CHARACTERISTICS[material_type])
         },
         "timestamp": int(time.time())
     }
@@ -1,7 +1,6 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import Optional, Dict, Any
-import asyncio
 import httpx
 import time
 
@@ -15,6 +14,31 @@ config_data = {
     "esp32Ip": "192.168.1.45"
 }
 
+# Ping targets and the config entry holding each device's IP
+_PING_TARGETS = {
+    "esp-camera": "esp_camera_ip",
+    "esp-data": "esp_data_ip"
+}
+
+# Shared client for device pings, so repeated pings reuse keep-alive connections
+_ping_client: Optional[httpx.AsyncClient] = None
+
+def _get_ping_client() -> httpx.AsyncClient:
+    global _ping_client
+    if _ping_client is None or _ping_client.is_closed:
+        _ping_client = httpx.AsyncClient(
+            timeout=5.0,
+            limits=httpx.Limits(max_connections=32, max_keepalive_connections=8)
+        )
+    return _ping_client
+
+async def close_ping_client():
+    """Close the shared ping client"""
+    global _ping_client
+    if _ping_client is not None:
+        client, _ping_client = _ping_client, None
+        await client.aclose()
+
 class ConfigModel(BaseModel):
     esp_camera_ip: str
     esp_data_ip: str
@@ -63,33 +87,23 @@ async def update_config(config: ConfigModel):
 @router.get("/ping/{target}", response_model=PingResponse)
 async def ping_target(target: str):
     """Ping ESP32 devices or server"""
-    start_time = time.time()
+    if target == "server":
+        # Answering this request is the server's ping
+        return {"status": "ok", "latency": 0}
+    
+    ip_key = _PING_TARGETS.get(target)
+    if ip_key is None:
+        raise HTTPException(status_code=400, detail="Invalid target. Use: esp-camera, esp-data, or server")
     
+    start_time = time.perf_counter()
     try:
-        if target == "esp-camera":
-            # Ping ESP32 camera
-            async with httpx.AsyncClient() as client:
-                response = await client.get(f"http://{config_data['esp_camera_ip']}/status", timeout=5.0)
-                if response.status_code == 200:
-                    latency = int((time.time() - start_time) * 1000)
-                    return {"status": "ok", "latency": latency}
-        elif target == "esp-data":
-            # Ping ESP32 data module
-            async with httpx.AsyncClient() as client:
-                response = await client.get(f"http://{config_data['esp_data_ip']}/status", timeout=5.0)
-                if response.status_code == 200:
-                    latency = int((time.time() - start_time) * 1000)
-                    return {"status": "ok", "latency": latency}
-        elif target == "server":
-            # Ping self (server)
-            latency = int((time.time() - start_time) * 1000)
-            return {"status": "ok", "latency": latency}
-        else:
-            raise HTTPException(status_code=400, detail="Invalid target. Use: esp-camera, esp-data, or server")
-            
+        response = await _get_ping_client().get(f"http://{config_data[ip_key]}/status")
     except httpx.TimeoutException:
         return {"status": "timeout"}
     except Exception as e:
         return {"status": "error"}
     
+    if response.status_code == 200:
+        latency = int((time.perf_counter() - start_time) * 1000)
+        return {"status": "ok", "latency": latency}
     return {"status": "failed"}
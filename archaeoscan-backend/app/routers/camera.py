@@ -1,47 +1,157 @@
-from fastapi import APIRouter, Depends, HTTPException, File, UploadFile, Response
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Depends, HTTPException, File, UploadFile, Response, WebSocket
+from fastapi.responses import ORJSONResponse, StreamingResponse
 import os
 from pathlib import Path
-import requests
 from datetime import datetime
-import subprocess
-import threading
-import cv2
-import numpy as np
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 import base64
 import binascii
 from datetime import datetime
 import httpx
 import asyncio
+import logging
 
 from app import models, db
 from app.schemas import (
-    CameraReadingRequest, CameraReadingResponse
+    CameraReadingRequest, CameraReadingResponse, CameraReadingMetaResponse
 )
+from app.websocket import camera_channel
+from app.routers.settings import get_current_settings_async
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
+
+# Shared client for the ESP32-CAM stream proxy and snapshots.
+# Only connecting is bounded by default; reads have no timeout because streams are long-lived.
+_stream_client = httpx.AsyncClient(
+    timeout=httpx.Timeout(10.0, read=None),
+    limits=httpx.Limits(max_keepalive_connections=4)
+)
+STREAM_CHUNK_SIZE = 65536  # Read the MJPEG stream in 64 KB chunks
+
+# Write-behind queue for camera uploads: frames are committed in batches
+# so a burst from the ESP32-CAM costs one commit instead of one per frame.
+INGEST_BATCH_SIZE = 64
+INGEST_FLUSH_INTERVAL = 0.1  # seconds
+INGEST_QUEUE_SIZE = 1024
+_ingest_queue: Optional[asyncio.Queue] = None
+_ingest_task: Optional[asyncio.Task] = None
+
+
+def _save_camera_readings(readings: List[models.CameraReading]):
+    """
+    Insert camera readings in a single transaction and notify subscribers.
+    """
+    # Keep attributes loaded after commit so building events needs no extra SELECTs
+    session = db.SessionLocal(expire_on_commit=False)
+    try:
+        session.add_all(readings)
+        session.commit()
+        events = [
+            {
+                "type": "camera_image",
+                "id": reading.id,
+                "device_id": reading.device_id,
+                "timestamp": reading.timestamp.isoformat()
+            }
+            for reading in readings
+        ]
+    finally:
+        session.close()
+    
+    # Notify subscribers of the new frames instead of having them poll /camera/latest
+    for event in events:
+        camera_channel.publish(event)
+    return events
+
+
+def _save_camera_readings_individually(readings: List[models.CameraReading]):
+    """
+    Fallback after a failed batch: insert each reading in its own transaction,
+    so one bad frame does not cost the rest of the batch.
+    """
+    for reading in readings:
+        # The rolled-back batch may have left a primary key assigned
+        reading.id = None
+        try:
+            _save_camera_readings([reading])
+        except Exception:
+            logger.exception("Dropping camera reading from %s", reading.device_id)
+
+
+async def _run_camera_ingest():
+    """
+    Drain the ingest queue, flushing every INGEST_BATCH_SIZE readings or INGEST_FLUSH_INTERVAL.
+    A ``None`` item flushes what has been collected and stops the task.
+    """
+    loop = asyncio.get_running_loop()
+    stopping = False
+    while not stopping:
+        item = await _ingest_queue.get()
+        if item is None:
+            break
+        batch = [item]
+        deadline = loop.time() + INGEST_FLUSH_INTERVAL
+        while len(batch) < INGEST_BATCH_SIZE:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(_ingest_queue.get(), remaining)
+            except asyncio.TimeoutError:
+                break
+            if item is None:
+                stopping = True
+                break
+            batch.append(item)
+        try:
+            await asyncio.to_thread(_save_camera_readings, batch)
+        except Exception:
+            logger.exception("Error saving camera batch of %d readings; retrying one by one", len(batch))
+            await asyncio.to_thread(_save_camera_readings_individually, batch)
+
+
+def start_camera_ingest():
+    """
+    Start the background task that commits queued camera uploads.
+    """
+    global _ingest_queue, _ingest_task
+    if _ingest_task is None or _ingest_task.done():
+        _ingest_queue = asyncio.Queue(maxsize=INGEST_QUEUE_SIZE)
+        _ingest_task = asyncio.create_task(_run_camera_ingest())
+
+
+async def stop_camera_ingest():
+    """
+    Commit anything still queued and stop the ingest task.
+    """
+    global _ingest_task
+    if _ingest_task is not None:
+        task, _ingest_task = _ingest_task, None
+        await _ingest_queue.put(None)
+        await task
+
 
 @router.post("/camera")
-def upload_camera_image(camera_data: CameraReadingRequest, db: Session = Depends(db.get_db)):
+async def upload_camera_image(camera_data: CameraReadingRequest, sync: bool = False):
     """
     Receive images/video streams from ESP32-CAM.
+    
+    Uploads are queued and committed in batches; pass ``sync=true`` to wait
+    for the row to be written and get its id back.
     """
-    # Validate base64 image data
+    # Validate and decode base64 image data with a single strict decode;
+    # the raw bytes are stored so reads need no decoding
     try:
-        # Attempt to decode the base64 string to validate it
-        base64_bytes = camera_data.image_base64.encode('utf-8')
-        decoded_bytes = base64.b64decode(base64_bytes)
-        # Re-encode to ensure it's valid
-        reencoded = base64.b64encode(decoded_bytes).decode('utf-8')
+        image_data = base64.b64decode(camera_data.image_base64, validate=True)
     except (binascii.Error, ValueError):
         raise HTTPException(status_code=400, detail="Invalid base64 image data")
     
     # Create camera reading record
     db_camera_reading = models.CameraReading(
         timestamp=datetime.fromtimestamp(camera_data.timestamp / 1000) if camera_data.timestamp else datetime.utcnow(),
-        image_base64=camera_data.image_base64,
+        image_data=image_data,
         location_lat=camera_data.location_lat,
         location_lng=camera_data.location_lng,
         accuracy=camera_data.accuracy,
@@ -49,17 +159,34 @@ def upload_camera_image(camera_data: CameraReadingRequest, db: Session = Depends
         device_id=camera_data.device_id
     )
     
-    db.add(db_camera_reading)
-    db.commit()
-    db.refresh(db_camera_reading)
+    # Fall back to a direct write when the ingest task is not running
+    if sync or _ingest_task is None or _ingest_task.done():
+        event = (await asyncio.to_thread(_save_camera_readings, [db_camera_reading]))[0]
+        return {
+            "message": "Camera image received successfully",
+            "id": event["id"],
+            "timestamp": db_camera_reading.timestamp
+        }
     
+    await _ingest_queue.put(db_camera_reading)
     return {
-        "message": "Camera image received successfully",
-        "id": db_camera_reading.id,
+        "message": "Camera image queued successfully",
+        "queued": True,
         "timestamp": db_camera_reading.timestamp
     }
 
-@router.get("/camera/images", response_model=List[CameraReadingResponse])
+# Columns behind CameraReadingMetaResponse, in field order
+_CAMERA_META_COLUMNS = (
+    models.CameraReading.id,
+    models.CameraReading.timestamp,
+    models.CameraReading.location_lat,
+    models.CameraReading.location_lng,
+    models.CameraReading.accuracy,
+    models.CameraReading.battery_level,
+    models.CameraReading.device_id
+)
+
+@router.get("/camera/images", response_model=List[CameraReadingMetaResponse])
 def get_camera_images(
     device_id: Optional[str] = None,
     start_time: Optional[datetime] = None,
@@ -69,9 +196,11 @@ def get_camera_images(
     db: Session = Depends(db.get_db)
 ):
     """
-    Get stored camera images with optional filtering.
+    Get stored camera image metadata with optional filtering.
+    Image bodies are fetched separately via /camera/images/{reading_id}/image.
     """
-    query = db.query(models.CameraReading)
+    # Select only the metadata columns so the image data is never read
+    query = db.query(*_CAMERA_META_COLUMNS)
     
     if device_id:
         query = query.filter(models.CameraReading.device_id == device_id)
@@ -83,32 +212,36 @@ def get_camera_images(
     query = query.order_by(models.CameraReading.timestamp.desc())
     query = query.offset(skip).limit(limit)
     
-    camera_readings = query.all()
+    # Rows come straight from our own table, so serialize them without re-validating
+    return ORJSONResponse([reading._asdict() for reading in query.all()])
+
+@router.get("/camera/images/{reading_id}/image")
+def get_camera_image(reading_id: int, db: Session = Depends(db.get_db)):
+    """
+    Get the raw JPEG bytes of a single stored camera image.
+    """
+    row = db.query(models.CameraReading.image_data, models.CameraReading.image_base64)\
+        .filter(models.CameraReading.id == reading_id)\
+        .first()
+    
+    if row is None or not (row.image_data or row.image_base64):
+        raise HTTPException(status_code=404, detail="Camera image not found")
     
-    response_images = []
-    for reading in camera_readings:
-        response_images.append(CameraReadingResponse(
-            id=reading.id,
-            timestamp=reading.timestamp,
-            image_base64=reading.image_base64,
-            location_lat=reading.location_lat,
-            location_lng=reading.location_lng,
-            accuracy=reading.accuracy,
-            battery_level=reading.battery_level,
-            device_id=reading.device_id
-        ))
+    # Older rows only kept the base64 text
+    image_data = row.image_data or base64.b64decode(row.image_base64)
     
-    return response_images
+    return Response(content=image_data, media_type="image/jpeg")
 
-@router.get("/camera/latest")
+@router.get("/camera/latest", response_model=CameraReadingMetaResponse)
 def get_latest_camera_image(
     device_id: Optional[str] = "default_camera",
     db: Session = Depends(db.get_db)
 ):
     """
-    Get the most recent camera image from a specific device.
+    Get metadata of the most recent camera image from a specific device.
+    The image itself is fetched via /camera/images/{reading_id}/image.
     """
-    camera_reading = db.query(models.CameraReading)\
+    camera_reading = db.query(*_CAMERA_META_COLUMNS)\
         .filter(models.CameraReading.device_id == device_id)\
         .order_by(models.CameraReading.timestamp.desc())\
         .first()
@@ -116,16 +249,14 @@ def get_latest_camera_image(
     if not camera_reading:
         raise HTTPException(status_code=404, detail="No camera images found for the device")
     
-    return CameraReadingResponse(
-        id=camera_reading.id,
-        timestamp=camera_reading.timestamp,
-        image_base64=camera_reading.image_base64,
-        location_lat=camera_reading.location_lat,
-        location_lng=camera_reading.location_lng,
-        accuracy=camera_reading.accuracy,
-        battery_level=camera_reading.battery_level,
-        device_id=camera_reading.device_id
-    )
+    return ORJSONResponse(camera_reading._asdict())
+
+@router.websocket("/ws/camera")
+async def camera_updates_websocket(websocket: WebSocket):
+    """
+    Push a notification whenever a new camera image is stored.
+    """
+    await camera_channel.serve(websocket)
 
 @router.get("/camera/stream")
 async def stream_camera_video():
@@ -134,33 +265,37 @@ async def stream_camera_video():
     This allows HTTPS websites to display HTTP camera streams.
     """
     # Get ESP32-CAM IP from settings
-    from .settings import _settings_storage
-    esp32_ip = _settings_storage.get("esp32Ip", "172.20.10.9")
+    esp32_ip = (await get_current_settings_async())["esp32Ip"]
     stream_url = f"http://{esp32_ip}:81/stream"
     
     try:
-        # Use httpx to stream the response
-        async with httpx.AsyncClient() as client:
-            async with client.stream("GET", stream_url) as response:
-                # Set appropriate headers for MJPEG stream
-                headers = {
-                    "Content-Type": "multipart/x-mixed-replace; boundary=frame",
-                    "Cache-Control": "no-cache",
-                    "Connection": "keep-alive",
-                    "Access-Control-Allow-Origin": "*",
-                }
-                
-                async def stream_generator():
-                    async for chunk in response.aiter_bytes():
-                        yield chunk
-                
-                return StreamingResponse(
-                    stream_generator(),
-                    media_type="multipart/x-mixed-replace; boundary=frame",
-                    headers=headers
-                )
+        # Open the upstream stream on the shared keep-alive client
+        request = _stream_client.build_request("GET", stream_url)
+        response = await _stream_client.send(request, stream=True)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to connect to ESP32-CAM: {str(e)}")
+    
+    # Set appropriate headers for MJPEG stream
+    headers = {
+        "Content-Type": "multipart/x-mixed-replace; boundary=frame",
+        "Cache-Control": "no-cache",
+        "Connection": "keep-alive",
+        "Access-Control-Allow-Origin": "*",
+        "X-Accel-Buffering": "no",  # Stop reverse proxies from buffering frames
+    }
+    
+    async def stream_generator():
+        try:
+            async for chunk in response.aiter_raw(STREAM_CHUNK_SIZE):
+                yield chunk
+        finally:
+            await response.aclose()
+    
+    return StreamingResponse(
+        stream_generator(),
+        media_type="multipart/x-mixed-replace; boundary=frame",
+        headers=headers
+    )
 
 
 @router.get("/snapshot")
@@ -169,8 +304,7 @@ async def capture_snapshot():
     Capture a snapshot from ESP32-CAM and save to media folder.
     """
     # Get ESP32-CAM IP from settings
-    from .settings import _settings_storage
-    esp32_ip = _settings_storage.get("esp32Ip", "172.20.10.9")
+    esp32_ip = (await get_current_settings_async())["esp32Ip"]
     snapshot_url = f"http://{esp32_ip}/capture"
     
     try:
@@ -180,16 +314,15 @@ async def capture_snapshot():
         snapshots_path.mkdir(parents=True, exist_ok=True)
         
         # Capture the snapshot from ESP32
-        response = requests.get(snapshot_url, timeout=10)
+        response = await _stream_client.get(snapshot_url, timeout=10)
         if response.status_code == 200:
             # Generate filename with timestamp
             timestamp = datetime.now().strftime("%Y-%m-%dT%H-%M-%S")
             filename = f"snapshot_{timestamp}.jpg"
             filepath = snapshots_path / filename
             
-            # Save the image to the snapshots folder
-            with open(filepath, "wb") as f:
-                f.write(response.content)
+            # Save the image to the snapshots folder off the event loop
+            await asyncio.to_thread(filepath.write_bytes, response.content)
             
             return {
                 "message": "Snapshot captured successfully",
@@ -203,26 +336,21 @@ async def capture_snapshot():
         raise HTTPException(status_code=500, detail=f"Failed to capture snapshot: {str(e)}")
 
 
-# Global variable to track recording process
-recording_process = None
-recording_filename = None
-
-capturing_frames = False  # Flag to control frame capture
+# Active FFmpeg recordings keyed by device id, with the file each one writes
+_recordings: Dict[str, Tuple[asyncio.subprocess.Process, str]] = {}
 
 @router.post("/record/start")
-async def start_recording():
+async def start_recording(device_id: str = "default_device"):
     """
     Start recording video from ESP32-CAM.
     """
-    global recording_process, recording_filename
-    
-    if recording_process is not None and recording_process.poll() is None:
+    active = _recordings.get(device_id)
+    if active is not None and active[0].returncode is None:
         raise HTTPException(status_code=400, detail="Recording is already in progress")
     
     try:
         # Get ESP32-CAM IP from settings
-        from .settings import _settings_storage
-        esp32_ip = _settings_storage.get("esp32Ip", "172.20.10.9")
+        esp32_ip = (await get_current_settings_async())["esp32Ip"]
         stream_url = f"http://{esp32_ip}:81/stream"
         
         # Create media directories if they don't exist
@@ -232,133 +360,65 @@ async def start_recording():
         
         # Generate filename with timestamp
         timestamp = datetime.now().strftime("%Y-%m-%dT%H-%M-%S")
-        recording_filename = f"recording_{timestamp}.mp4"
+        recording_filename = f"recording_{device_id}_{timestamp}.mkv"
         filepath = recordings_path / recording_filename
         
-        # Try to use FFmpeg first, fallback to OpenCV if not available
-        try:
-            # Use FFmpeg to capture the MJPEG stream and convert to MP4
-            cmd = [
-                "ffmpeg",
-                "-i", stream_url,
-                "-t", "300",  # Maximum recording time: 5 minutes
-                "-c:v", "libx264",
-                "-preset", "ultrafast",
-                "-pix_fmt", "yuv420p",
-                "-movflags", "faststart",
-                str(filepath),
-                "-y"  # Overwrite output files without asking
-            ]
-            
-            # Start FFmpeg process in a separate thread
-            recording_process = subprocess.Popen(cmd)
-        except FileNotFoundError:
-            # FFmpeg not found, use OpenCV as fallback
-            print("FFmpeg not found, using OpenCV fallback for recording")
-            # Start recording thread with OpenCV
-            recording_thread = threading.Thread(target=record_with_opencv, args=(stream_url, str(filepath)))
-            recording_thread.daemon = True
-            recording_thread.start()
-            recording_process = recording_thread  # Store thread reference instead of process
+        # Remux the MJPEG stream into Matroska without re-encoding
+        cmd = [
+            "ffmpeg",
+            "-i", stream_url,
+            "-t", "300",  # Maximum recording time: 5 minutes
+            "-c", "copy",
+            str(filepath),
+            "-y"  # Overwrite output files without asking
+        ]
+        process = await asyncio.create_subprocess_exec(*cmd)
+        _recordings[device_id] = (process, recording_filename)
         
         return {
             "message": "Recording started successfully",
+            "device_id": device_id,
             "filename": recording_filename,
             "path": str(filepath)
         }
         
     except FileNotFoundError:
-        raise HTTPException(status_code=500, detail="FFmpeg is not installed or not found in PATH")
+        raise HTTPException(status_code=503, detail="FFmpeg is not installed or not found in PATH; install ffmpeg to enable recording")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to start recording: {str(e)}")
 
 
 @router.post("/record/stop")
-async def stop_recording():
+async def stop_recording(device_id: str = "default_device"):
     """
     Stop recording video from ESP32-CAM.
     """
-    global recording_process, recording_filename
-    
-    if recording_process is None:
+    active = _recordings.pop(device_id, None)
+    if active is None:
         raise HTTPException(status_code=400, detail="No recording is in progress")
+    process, recording_filename = active
     
     try:
-        # Check if recording_process is a subprocess (FFmpeg) or thread (OpenCV)
-        if hasattr(recording_process, 'terminate'):  # FFmpeg process
-            recording_process.terminate()
-            recording_process.wait(timeout=5)  # Wait up to 5 seconds for graceful shutdown
-        else:  # OpenCV thread
-            stop_opencv_recording()
-            # Wait a moment for the thread to finish
-            import time
-            time.sleep(1)
-        
-        recording_process = None
+        if process.returncode is None:
+            process.terminate()
+        # Wait up to 5 seconds for FFmpeg to finalize the file
+        await asyncio.wait_for(process.wait(), timeout=5.0)
         
         return {
             "message": "Recording stopped successfully",
+            "device_id": device_id,
             "filename": recording_filename
         }
         
-    except subprocess.TimeoutExpired:
+    except asyncio.TimeoutError:
         # Force kill if it doesn't terminate gracefully
-        recording_process.kill()
-        recording_process = None
+        process.kill()
+        await process.wait()
         
         return {
             "message": "Recording stopped (forced termination)",
+            "device_id": device_id,
             "filename": recording_filename
         }
     except Exception as e:
-        recording_process = None
         raise HTTPException(status_code=500, detail=f"Failed to stop recording: {str(e)}")
-
-
-def record_with_opencv(stream_url: str, output_path: str):
-    """
-    Record video using OpenCV as fallback when FFmpeg is not available.
-    """
-    global capturing_frames
-    capturing_frames = True
-    
-    # Open the video stream
-    cap = cv2.VideoCapture(stream_url)
-    
-    # Get the frames per second and frame dimensions
-    fps = int(cap.get(cv2.CAP_PROP_FPS))
-    if fps <= 0:  # Sometimes FPS is not available from MJPEG stream
-        fps = 15  # Default to 15 FPS
-    
-    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-    
-    # Define the codec and create VideoWriter object
-    fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-    out = cv2.VideoWriter(output_path, fourcc, fps, (width, height))
-    
-    start_time = time.time()
-    max_duration = 300  # Maximum recording time: 5 minutes
-    
-    while capturing_frames and (time.time() - start_time) < max_duration:
-        ret, frame = cap.read()
-        if not ret:
-            print("Failed to read frame from stream")
-            break
-        
-        # Write the frame
-        out.write(frame)
-    
-    # Release everything
-    cap.release()
-    out.release()
-    capturing_frames = False
-    print(f"Recording finished: {output_path}")
-
-
-def stop_opencv_recording():
-    """
-    Stop recording that was started with OpenCV.
-    """
-    global capturing_frames
-    capturing_frames = False
\ No newline at end of file
@@ -1,9 +1,11 @@
 from fastapi import APIRouter, HTTPException, WebSocket
-from pydantic import BaseModel
+from pydantic import BaseModel, ValidationError
 from typing import List, Optional
 from datetime import datetime
-import json
 import asyncio
+import orjson
+
+from app.websocket import manager
 
 router = APIRouter()
 
@@ -25,6 +27,10 @@ class ESP32Response(BaseModel):
 latest_esp32_data = None
 esp32_last_seen = None
 
+def _sensor_message(data: dict) -> str:
+    """Serialize ESP32 data once as the sensor_data message sent to every client"""
+    return orjson.dumps({"type": "sensor_data", "data": data}).decode()
+
 @router.post("/data", response_model=ESP32Response)
 async def receive_esp32_data(data: ESP32SensorData):
     """Receive sensor data from ESP32"""
@@ -32,15 +38,12 @@ async def receive_esp32_data(data: ESP32SensorData):
     
     try:
         # Store the data
-        latest_esp32_data = data.dict()
+        latest_esp32_data = data.model_dump()
         esp32_last_seen = datetime.now()
         
-        # Broadcast to WebSocket clients
-        from app.websocket import manager
-        await manager.broadcast(json.dumps({
-            "type": "sensor_data",
-            "data": data.dict()
-        }))
+        # Hand off to the broadcast sender; device packets are queued, never coalesced
+        # with the simulated stream, and the ESP32 does not wait on dashboard clients
+        manager.publish(_sensor_message(latest_esp32_data))
         
         print(f"Received ESP32 data: {data.lat}, {data.lng} at depth {data.depth}m")
         
@@ -95,37 +98,34 @@ async def esp32_websocket(websocket: WebSocket):
             data = await websocket.receive_text()
             
             try:
-                # Parse JSON data
-                sensor_data = ESP32SensorData(**json.loads(data))
+                # Parse and validate the JSON in one pass
+                sensor_data = ESP32SensorData.model_validate_json(data)
                 
-                # Store and broadcast
+                # Store and broadcast, reusing one dict for both
                 global latest_esp32_data, esp32_last_seen
-                latest_esp32_data = sensor_data.dict()
+                latest_esp32_data = sensor_data.model_dump()
                 esp32_last_seen = datetime.now()
                 
                 # Broadcast to frontend clients
-                from app.websocket import manager
-                await manager.broadcast(json.dumps({
-                    "type": "sensor_data",
-                    "data": sensor_data.dict()
-                }))
+                manager.publish(_sensor_message(latest_esp32_data))
                 
                 # Send acknowledgment to ESP32
-                await websocket.send_text(json.dumps({
+                await websocket.send_text(orjson.dumps({
                     "status": "received",
                     "timestamp": int(datetime.now().timestamp())
-                }))
+                }).decode())
                 
-            except json.JSONDecodeError:
-                await websocket.send_text(json.dumps({
+            except ValidationError as e:
+                invalid_json = e.errors()[0]["type"] == "json_invalid"
+                await websocket.send_text(orjson.dumps({
                     "status": "error",
-                    "message": "Invalid JSON format"
-                }))
+                    "message": "Invalid JSON format" if invalid_json else str(e)
+                }).decode())
             except Exception as e:
-                await websocket.send_text(json.dumps({
+                await websocket.send_text(orjson.dumps({
                     "status": "error", 
                     "message": str(e)
-                }))
+                }).decode())
                 
     except Exception as e:
         print(f"ESP32 WebSocket error: {e}")
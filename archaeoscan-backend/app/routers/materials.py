@@ -12,9 +12,12 @@ from app.schemas import (
 # Import all necessary schemas directly to avoid circular import issues
 from app.schemas import (
     MaterialClassificationResponse, SpectrometerReadingRequest, MaterialType,
-    MaterialClassificationRequest, AnalysisResult
+    MaterialClassificationRequest, AnalysisResult, BatchClassificationRequest,
+    BatchClassificationResult
+)
+from app.services.material_classification import (
+    classify_material, classify_materials, get_material_properties
 )
-from app.services.material_classification import classify_material, get_material_properties
 
 router = APIRouter()
 
@@ -69,6 +72,20 @@ def analyze_material(
         device_id=db_material_classification.device_id
     )
 
+@router.post("/materials/classify-batch", response_model=List[BatchClassificationResult])
+def classify_material_batch(request: BatchClassificationRequest):
+    """
+    Classify several spectra with one classifier pass, without storing the results.
+    """
+    if len(request.wavelengths) != len(request.intensities):
+        raise HTTPException(status_code=400, detail="wavelengths and intensities must have the same number of spectra")
+    
+    return classify_materials(
+        wavelengths=request.wavelengths,
+        intensities=request.intensities,
+        environmental_context=request.environmental_context or {}
+    )
+
 @router.get("/materials/classifications", response_model=List[MaterialClassificationResponse])
 def get_material_classifications(
     device_id: Optional[str] = None,
@@ -1,35 +1,103 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List, Optional
-import json
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.exceptions import RequestValidationError
+from pydantic import ValidationError
+from sqlalchemy import DateTime, Float, Integer, String, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Tuple
+import numpy as np
+import orjson
 from datetime import datetime
 
 from app import models, db
 from app.schemas import (
-    RadarReadingRequest, RadarReadingResponse
+    RadarReadingMetadata, RadarReadingRequest, RadarReadingResponse
 )
 from app.services.radar_processing import process_radar_data, analyze_depth_layers
 
 router = APIRouter()
 
-@router.post("/radar/process")
-def process_radar_reading(
-    radar_data: RadarReadingRequest,
-    db: Session = Depends(db.get_db)
+# Radar samples travel and are processed as little-endian float32
+RADAR_SAMPLE_DTYPE = np.dtype('<f4')
+
+async def _read_radar_request(request: Request) -> Tuple[RadarReadingMetadata, np.ndarray]:
+    """
+    Parse a radar reading straight into a sample array.
+    
+    JSON bodies are decoded with orjson and depth_profile becomes an array once,
+    instead of passing through a list of Python floats. application/octet-stream
+    bodies are the raw samples, with the metadata in the query string.
+    """
+    body = await request.body()
+    source = "body"
+    try:
+        if request.headers.get("content-type", "").startswith("application/octet-stream"):
+            if len(body) % RADAR_SAMPLE_DTYPE.itemsize:
+                raise HTTPException(status_code=400, detail="Body is not a whole number of float32 samples")
+            depth_profile = np.frombuffer(body, dtype=RADAR_SAMPLE_DTYPE)
+            source = "query"
+            metadata = RadarReadingMetadata.model_validate({"anomalies": [], **request.query_params})
+        else:
+            try:
+                payload = orjson.loads(body)
+            except orjson.JSONDecodeError:
+                raise HTTPException(status_code=400, detail="Invalid JSON body")
+            if not isinstance(payload, dict) or "depth_profile" not in payload:
+                raise RequestValidationError([{
+                    "type": "missing", "loc": ("body", "depth_profile"), "msg": "Field required", "input": payload
+                }])
+            try:
+                depth_profile = np.asarray(payload.pop("depth_profile"), dtype=RADAR_SAMPLE_DTYPE)
+            except (TypeError, ValueError):
+                raise RequestValidationError([{
+                    "type": "float_type", "loc": ("body", "depth_profile"),
+                    "msg": "Input should be a list of numbers", "input": None
+                }])
+            metadata = RadarReadingMetadata.model_validate(payload)
+    except ValidationError as e:
+        raise RequestValidationError([
+            {**error, "loc": (source, *error["loc"])} for error in e.errors(include_url=False)
+        ])
+    
+    if depth_profile.ndim != 1:
+        raise RequestValidationError([{
+            "type": "list_type", "loc": ("body", "depth_profile"),
+            "msg": "Input should be a flat list of numbers", "input": None
+        }])
+    return metadata, depth_profile
+
+@router.post(
+    "/radar/process",
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {"schema": RadarReadingRequest.model_json_schema()},
+                "application/octet-stream": {"schema": {"type": "string", "format": "binary"}}
+            }
+        }
+    }
+)
+async def process_radar_reading(
+    request: Request,
+    db: AsyncSession = Depends(db.get_async_db)
 ):
     """
     Process radar data and detect anomalies.
+    Accepts a JSON RadarReadingRequest, or raw float32 samples as
+    application/octet-stream with the other fields as query parameters.
     """
+    radar_data, depth_profile = await _read_radar_request(request)
+    
     # Process the radar data to detect anomalies
     processed_result = process_radar_data(
-        depth_profile=radar_data.depth_profile,
+        depth_profile=depth_profile,
         coordinates=(radar_data.location_lat or 0.0, radar_data.location_lng or 0.0) if radar_data.location_lat and radar_data.location_lng else None
     )
     
     # Create radar reading record
     db_radar_reading = models.RadarReading(
         timestamp=datetime.fromtimestamp(radar_data.timestamp / 1000) if radar_data.timestamp else datetime.utcnow(),
-        depth_profile=radar_data.depth_profile,
+        depth_profile=depth_profile,
         anomalies=radar_data.anomalies,
         processed_anomalies=processed_result['anomalies'],
         location_lat=radar_data.location_lat,
@@ -40,55 +108,78 @@ def process_radar_reading(
     )
     
     db.add(db_radar_reading)
-    db.commit()
-    db.refresh(db_radar_reading)
+    await db.flush()
     
-    return {
+    # Encode the response before committing, so a reading is only stored
+    # when the client can be told it was
+    content = orjson.dumps({
         "id": db_radar_reading.id,
         "timestamp": db_radar_reading.timestamp,
         "original_anomalies": radar_data.anomalies,
         "processed_anomalies": processed_result['anomalies'],
         "total_detected": processed_result['total_detected'],
         "message": "Radar data processed successfully"
-    }
+    })
+    await db.commit()
+    
+    return Response(content=content, media_type="application/json")
 
 @router.get("/radar/anomalies", response_model=List[dict])
-def get_radar_anomalies(
+async def get_radar_anomalies(
     device_id: Optional[str] = None,
     anomaly_type: Optional[str] = None,
     min_confidence: Optional[float] = 0.0,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(db.get_db)
+    db: AsyncSession = Depends(db.get_async_db)
 ):
     """
     Get detected radar anomalies with optional filtering.
+    skip and limit page through the matching anomalies, newest readings first.
     """
-    query = db.query(models.RadarReading)
+    # Expand each reading's anomaly list and filter the elements inside the database,
+    # so only matching anomalies are returned and decoded
+    postgres = db.bind.dialect.name == "postgresql"
+    if postgres:
+        elements = "CROSS JOIN LATERAL json_array_elements(r.processed_anomalies) WITH ORDINALITY AS a(value, ordinal)"
+        position = "a.ordinal"
+        anomaly_field = "a.value->>'{}'"
+        confidence = "coalesce((a.value->>'confidence')::float, 0)"
+    else:
+        elements = "CROSS JOIN json_each(r.processed_anomalies) AS a"
+        position = "a.key"
+        anomaly_field = "json_extract(a.value, '$.{}')"
+        confidence = "coalesce(json_extract(a.value, '$.confidence'), 0)"
     
+    conditions = [f"{confidence} >= :min_confidence"]
+    params = {"min_confidence": min_confidence or 0.0, "skip": skip, "limit": limit}
     if device_id:
-        query = query.filter(models.RadarReading.device_id == device_id)
-    
-    query = query.order_by(models.RadarReading.timestamp.desc())
-    query = query.offset(skip).limit(limit)
+        conditions.append("r.device_id = :device_id")
+        params["device_id"] = device_id
+    if anomaly_type:
+        conditions.append(f"{anomaly_field.format('type')} = :anomaly_type")
+        params["anomaly_type"] = anomaly_type
     
-    radar_readings = query.all()
+    # Newest readings first, then each reading's anomalies in array order; the
+    # position makes the order total so pages never overlap or skip rows
+    query = text(
+        f"SELECT r.id, r.timestamp, r.location_lat, r.location_lng, a.value AS anomaly "
+        f"FROM radar_readings AS r {elements} "
+        f"WHERE {' AND '.join(conditions)} "
+        f"ORDER BY r.timestamp DESC, r.id DESC, {position} "
+        f"LIMIT :limit OFFSET :skip"
+    ).columns(id=Integer, timestamp=DateTime, location_lat=Float, location_lng=Float, anomaly=String)
     
     all_anomalies = []
-    for reading in radar_readings:
-        if reading.processed_anomalies:
-            for anomaly in reading.processed_anomalies:
-                if anomaly_type and anomaly.get('type') != anomaly_type:
-                    continue
-                if anomaly.get('confidence', 0) < min_confidence:
-                    continue
-                anomaly['reading_id'] = reading.id
-                anomaly['timestamp'] = reading.timestamp
-                anomaly['location'] = {
-                    'lat': reading.location_lat,
-                    'lng': reading.location_lng
-                }
-                all_anomalies.append(anomaly)
+    for row in await db.execute(query, params):
+        anomaly = orjson.loads(row.anomaly)
+        anomaly['reading_id'] = row.id
+        anomaly['timestamp'] = row.timestamp
+        anomaly['location'] = {
+            'lat': row.location_lat,
+            'lng': row.location_lng
+        }
+        all_anomalies.append(anomaly)
     
     return all_anomalies
 
@@ -1,19 +1,61 @@
 from fastapi import APIRouter, HTTPException, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.exc import SQLAlchemyError
 from typing import Dict, Any, Optional
+import asyncio
 import json
 import csv
+import time
 from datetime import datetime
 import io
+from itertools import chain
+
+from app import models, db
 
 router = APIRouter()
 
-# Mock settings storage (in real app, this would be in database)
-_settings_storage = {
+DEFAULT_SETTINGS = {
     "websocketUrl": "ws://localhost:8000/ws",
     "esp32Ip": "172.20.10.9",
     "units": "metric"
 }
 
+# Settings are stored in the database so every worker sees the same values.
+# Reads are served from this process's copy for up to SETTINGS_CACHE_TTL seconds;
+# writes in this process refresh it immediately.
+SETTINGS_CACHE_TTL = 30.0
+_settings_cache = (float("-inf"), None)  # (monotonic load time, settings)
+
+def _load_settings() -> Dict[str, Any]:
+    """Read stored settings over the defaults"""
+    session = db.SessionLocal()
+    try:
+        stored = {row.key: row.value for row in session.query(models.AppSetting).all()}
+    except SQLAlchemyError as e:
+        print(f"Could not load settings, using defaults: {e}")
+        stored = {}
+    finally:
+        session.close()
+    return {**DEFAULT_SETTINGS, **stored}
+
+def get_current_settings() -> Dict[str, Any]:
+    """Get application settings, reloading them once the cached copy is older than the TTL"""
+    global _settings_cache
+    loaded_at, settings = _settings_cache
+    if settings is None or time.monotonic() - loaded_at >= SETTINGS_CACHE_TTL:
+        settings = _load_settings()
+        _settings_cache = (time.monotonic(), settings)
+    return settings
+
+async def get_current_settings_async() -> Dict[str, Any]:
+    """get_current_settings for async endpoints: a reload reads the database off the event loop"""
+    global _settings_cache
+    loaded_at, settings = _settings_cache
+    if settings is None or time.monotonic() - loaded_at >= SETTINGS_CACHE_TTL:
+        settings = await asyncio.to_thread(_load_settings)
+        _settings_cache = (time.monotonic(), settings)
+    return settings
+
 # Mock data for export (in real app, this would come from database)
 _mock_data = [
     {
@@ -45,12 +87,12 @@ _mock_data = [
 @router.get("/settings/config")
 def get_settings():
     """Get current application settings"""
-    return _settings_storage
+    return get_current_settings()
 
 @router.post("/settings/config")
 def update_settings(settings: Dict[str, Any]):
     """Update application settings"""
-    global _settings_storage
+    global _settings_cache
     
     # Validate settings
     allowed_keys = {"websocketUrl", "esp32Ip", "units"}
@@ -59,37 +101,45 @@ def update_settings(settings: Dict[str, Any]):
             raise HTTPException(status_code=400, detail=f"Invalid setting key: {key}")
     
     # Update settings
-    _settings_storage.update(settings)
+    session = db.SessionLocal()
+    try:
+        for key, value in settings.items():
+            session.merge(models.AppSetting(key=key, value=value))
+        session.commit()
+    finally:
+        session.close()
+    
+    _settings_cache = (time.monotonic(), _load_settings())
     
     return {
         "message": "Settings updated successfully",
-        "settings": _settings_storage
+        "settings": _settings_cache[1]
     }
 
 @router.post("/settings/export/csv")
 def export_data_csv():
     """Export collected data as CSV file"""
-    # Create CSV content
-    output = io.StringIO()
-    writer = csv.writer(output)
-    
-    # Write header
-    if _mock_data:
-        writer.writerow(_mock_data[0].keys())
+    def row_iter():
+        # Reuse one small buffer, emitting each row as soon as it is written
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
         
-        # Write data rows
-        for row in _mock_data:
-            writer.writerow(row.values())
-    
-    # Create response with CSV content
-    csv_content = output.getvalue()
-    output.close()
+        if not _mock_data:
+            return
+        
+        # Write header, then data rows
+        header = _mock_data[0].keys()
+        for row in chain([header], (record.values() for record in _mock_data)):
+            writer.writerow(row)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
     
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     filename = f"archaeoscan_data_{timestamp}.csv"
     
-    return Response(
-        content=csv_content,
+    return StreamingResponse(
+        row_iter(),
         media_type="text/csv",
         headers={
             "Content-Disposition": f"attachment; filename={filename}"
@@ -102,7 +152,7 @@ def export_data_pdf():
     # In a real implementation, you would use a PDF library like reportlab
     # This is a simplified text-based PDF representation
     
-    pdf_content = f"""ArchaeoScan Data Export
+    parts = [f"""ArchaeoScan Data Export
 ======================
 
 Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
@@ -110,20 +160,20 @@ Total Records: {len(_mock_data)}
 
 Data Summary:
 -------------
-"""
+"""]
     
     # Add data summary
     for record in _mock_data:
-        pdf_content += f"""
+        parts.append(f"""
 Timestamp: {record['timestamp']}
 Sensor: {record['sensor_type']}
 Value: {record['value']}
 Location: {record['location_lat']}, {record['location_lng']}
 Accuracy: ±{record['accuracy']}m
-"""
+""")
     
     # Convert to bytes for PDF response
-    pdf_bytes = pdf_content.encode('utf-8')
+    pdf_bytes = "".join(parts).encode('utf-8')
     
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     filename = f"archaeoscan_data_{timestamp}.pdf"
@@ -139,14 +189,17 @@ Accuracy: ±{record['accuracy']}m
 @router.post("/settings/reset")
 def reset_settings():
     """Reset settings to default values"""
-    global _settings_storage
-    _settings_storage = {
-        "websocketUrl": "ws://localhost:8000/ws",
-        "esp32Ip": "172.20.10.9",
-        "units": "metric"
-    }
+    global _settings_cache
+    session = db.SessionLocal()
+    try:
+        session.query(models.AppSetting).delete()
+        session.commit()
+    finally:
+        session.close()
+    
+    _settings_cache = (time.monotonic(), dict(DEFAULT_SETTINGS))
     
     return {
         "message": "Settings reset to defaults",
-        "settings": _settings_storage
+        "settings": _settings_cache[1]
     }
\ No newline at end of file
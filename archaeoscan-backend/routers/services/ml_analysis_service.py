@@ -1,4 +1,4 @@
-from typing import Dict, List, Tuple, Any
+from typing import Dict, List, Tuple, Any, Callable, Optional
 from sklearn.linear_model import LinearRegression
 from sklearn.preprocessing import StandardScaler
 import numpy as np
@@ -18,6 +18,9 @@ class MLAnalysisService:
         self.model = LinearRegression()
         self.scaler = StandardScaler()
         self.is_trained = False
+        self.last_train_size = 0  # Samples used by the last successful training
+        # (sensor data watermark, analysis) of the last trend analysis
+        self._trend_cache: Optional[Tuple[int, Dict[str, Any]]] = None
         self.feature_columns = ['temperature', 'turbidity', 'tds', 'pressure', 'humidity', 'distance']
         
     def prepare_training_data(self, sensor_data_records: List[SensorData]) -> Tuple[np.ndarray, np.ndarray]:
@@ -60,6 +63,7 @@ class MLAnalysisService:
         
         # Train the model
         self.model.fit(X_scaled, y)
+        self.last_train_size = len(X)
         self.is_trained = True
         print(f"Model trained with {len(X)} samples")
     
@@ -117,23 +121,28 @@ class MLAnalysisService:
         """
         Compare preservation across different materials based on current conditions
         """
-        report = self.predict_preservation(sensor_reading)
-        materials = report['materials']
-        
-        # Sort materials by preservation (ascending - most vulnerable first)
-        sorted_materials = sorted(
-            [(mat, pres) for mat, pres in materials.items()],
-            key=lambda x: x[1]
+        # Only per-material scores are needed, so skip the full report and ML
+        # prediction and rank the vectorized scores directly
+        from .preservation_service import SensorData as SensorDataClass
+        sensor_data = SensorDataClass(
+            turbidity=sensor_reading.get('turbidity', 0),
+            temperature=sensor_reading.get('temperature', 0),
+            tds=sensor_reading.get('tds', 0)
         )
+        materials, scores = preservation_service.calculate_material_scores(sensor_data)
+        
+        # Sort materials by preservation (ascending - most vulnerable first);
+        # stable sort keeps database order for ties
+        order = np.argsort(scores, kind='stable')
         
         return [
             {
-                'material': mat,
+                'material': materials[i],
                 'preservation': pres,
                 'rank': idx + 1,
                 'risk_level': self._get_risk_level(pres)
             }
-            for idx, (mat, pres) in enumerate(sorted_materials)
+            for idx, (i, pres) in enumerate(zip(order.tolist(), scores[order].tolist()))
         ]
     
     def _get_risk_level(self, preservation: float) -> str:
@@ -145,6 +154,18 @@ class MLAnalysisService:
         else:
             return "high"
     
+    def get_trend_analysis(self, watermark: int, load_records: Callable[[], List[SensorData]]) -> Dict[str, Any]:
+        """
+        Trend analysis of the records returned by load_records, reused while the
+        sensor data watermark (see DatabaseService.get_sensor_data_watermark) is unchanged
+        """
+        if self._trend_cache is not None and self._trend_cache[0] == watermark:
+            return self._trend_cache[1]
+        
+        analysis = self.generate_trend_analysis(load_records())
+        self._trend_cache = (watermark, analysis)
+        return analysis
+    
     def generate_trend_analysis(self, sensor_data_records: List[SensorData]) -> Dict[str, Any]:
         """
         Generate trend analysis for historical data
@@ -1,9 +1,10 @@
 from typing import List, Dict, Any
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from models.database_models import SensorData, Settings
 from fastapi import WebSocket
 import asyncio
-import json
+import orjson
 
 class NotificationType:
     BATTERY_LOW = "battery_low"
@@ -14,15 +15,62 @@ class NotificationType:
     NEW_ARTIFACT = "new_artifact"
     PRESERVATION_CRITICAL = "preservation_critical"
 
+# Alert settings used when none are stored
+DEFAULT_ALERTS = {
+    "battery_threshold": 20,
+    "signal_threshold": "Weak",
+    "temperature_range": [-10, 40],
+    "turbidity_threshold": 50,
+    "tds_threshold": 500
+}
+
+@dataclass(frozen=True, slots=True)
+class AlertThresholds:
+    """Alert thresholds parsed once from the alert settings"""
+    battery: float
+    signal: str
+    temp_lo: float
+    temp_hi: float
+    turbidity: float
+    tds: float
+    # Temperatures more than 5 degrees outside the range are high severity
+    temp_lo_crit: float = field(init=False)
+    temp_hi_crit: float = field(init=False)
+    
+    def __post_init__(self):
+        object.__setattr__(self, "temp_lo_crit", self.temp_lo - 5)
+        object.__setattr__(self, "temp_hi_crit", self.temp_hi + 5)
+    
+    @classmethod
+    def from_alerts(cls, alerts: Dict[str, Any]) -> "AlertThresholds":
+        """Build thresholds from an alerts settings dict, falling back to DEFAULT_ALERTS per key"""
+        def get(key):
+            return alerts.get(key, DEFAULT_ALERTS[key])
+        temp_lo, temp_hi = get("temperature_range")
+        return cls(
+            battery=get("battery_threshold"),
+            signal=get("signal_threshold"),
+            temp_lo=temp_lo,
+            temp_hi=temp_hi,
+            turbidity=get("turbidity_threshold"),
+            tds=get("tds_threshold")
+        )
+
+DEFAULT_THRESHOLDS = AlertThresholds.from_alerts(DEFAULT_ALERTS)
+
 class NotificationsService:
     """
     Service for handling notifications and alerts
     """
     
     def __init__(self):
-        self.active_websockets: List[WebSocket] = []
+        # Dict used as an insertion-ordered set: O(1) add/remove, stable broadcast order
+        self.active_websockets: Dict[WebSocket, None] = {}
         self.settings = None
         self.last_notifications = {}
+        # Thresholds parsed from the last alert settings seen, and the settings they came from
+        self._thresholds = DEFAULT_THRESHOLDS
+        self._threshold_source = None
     
     async def broadcast_notification(self, notification: Dict[str, Any]):
         """
@@ -31,101 +79,100 @@ class NotificationsService:
         notification['timestamp'] = datetime.utcnow().isoformat()
         self.last_notifications[notification['type']] = notification
         
-        disconnected = []
-        for websocket in self.active_websockets:
-            try:
-                await websocket.send_text(json.dumps(notification))
-            except:
-                disconnected.append(websocket)
+        # Serialize once and send to every client concurrently; text frames for the frontend
+        payload = orjson.dumps(notification).decode()
+        websockets = list(self.active_websockets)
+        results = await asyncio.gather(
+            *(websocket.send_text(payload) for websocket in websockets),
+            return_exceptions=True
+        )
         
         # Remove disconnected websockets
-        for websocket in disconnected:
-            if websocket in self.active_websockets:
-                self.active_websockets.remove(websocket)
+        for websocket, result in zip(websockets, results):
+            if isinstance(result, Exception):
+                self.active_websockets.pop(websocket, None)
     
     def add_websocket(self, websocket: WebSocket):
         """
         Add a websocket to the list of active connections
         """
-        if websocket not in self.active_websockets:
-            self.active_websockets.append(websocket)
+        self.active_websockets.setdefault(websocket, None)
     
     def remove_websocket(self, websocket: WebSocket):
         """
         Remove a websocket from the list of active connections
         """
-        if websocket in self.active_websockets:
-            self.active_websockets.remove(websocket)
+        self.active_websockets.pop(websocket, None)
+    
+    def _get_thresholds(self, settings: Settings = None) -> "AlertThresholds":
+        """
+        Return thresholds for the given settings, rebuilding them only when the alert settings change
+        """
+        if not settings:
+            return DEFAULT_THRESHOLDS
+        alerts = settings.alerts if hasattr(settings, 'alerts') else {}
+        if alerts != self._threshold_source:
+            self._thresholds = AlertThresholds.from_alerts(alerts or {})
+            self._threshold_source = alerts
+        return self._thresholds
     
     def check_for_alerts(self, sensor_data: SensorData, settings: Settings = None):
         """
         Check if any sensor readings trigger alerts based on settings
         """
-        if not settings:
-            # Default settings if none provided
-            settings = {
-                "battery_threshold": 20,
-                "signal_threshold": "Weak",
-                "temperature_range": [-10, 40],
-                "turbidity_threshold": 50,
-                "tds_threshold": 500
-            }
-        else:
-            settings = settings.alerts if hasattr(settings, 'alerts') else {}
-        
+        thresholds = self._get_thresholds(settings)
         alerts = []
         
         # Check battery level
-        if sensor_data.battery is not None and sensor_data.battery < settings.get("battery_threshold", 20):
+        if sensor_data.battery is not None and sensor_data.battery < thresholds.battery:
             alerts.append({
                 "type": NotificationType.BATTERY_LOW,
                 "severity": "high",
                 "message": f"Battery level critical: {sensor_data.battery:.1f}%",
                 "value": sensor_data.battery,
-                "threshold": settings.get("battery_threshold", 20)
+                "threshold": thresholds.battery
             })
         
         # Check signal strength
-        if sensor_data.signal_strength and sensor_data.signal_strength == settings.get("signal_threshold", "Weak"):
+        if sensor_data.signal_strength and sensor_data.signal_strength == thresholds.signal:
             alerts.append({
                 "type": NotificationType.SIGNAL_WEAK,
                 "severity": "medium",
                 "message": f"Weak signal detected: {sensor_data.signal_strength}",
                 "value": sensor_data.signal_strength,
-                "threshold": settings.get("signal_threshold", "Weak")
+                "threshold": thresholds.signal
             })
         
         # Check turbidity
-        if sensor_data.turbidity is not None and sensor_data.turbidity > settings.get("turbidity_threshold", 50):
+        if sensor_data.turbidity is not None and sensor_data.turbidity > thresholds.turbidity:
             alerts.append({
                 "type": NotificationType.TURBIDITY_HIGH,
                 "severity": "medium",
                 "message": f"High water turbidity: {sensor_data.turbidity:.2f} NTU",
                 "value": sensor_data.turbidity,
-                "threshold": settings.get("turbidity_threshold", 50)
+                "threshold": thresholds.turbidity
             })
         
         # Check temperature
-        if sensor_data.temperature is not None:
-            temp_range = settings.get("temperature_range", [-10, 40])
-            if sensor_data.temperature < temp_range[0] or sensor_data.temperature > temp_range[1]:
-                severity = "high" if (sensor_data.temperature < temp_range[0] - 5 or sensor_data.temperature > temp_range[1] + 5) else "medium"
-                alerts.append({
-                    "type": NotificationType.TEMPERATURE_EXTREME,
-                    "severity": severity,
-                    "message": f"Extreme temperature: {sensor_data.temperature:.2f}°C",
-                    "value": sensor_data.temperature,
-                    "threshold": temp_range
-                })
+        temperature = sensor_data.temperature
+        if temperature is not None and not (thresholds.temp_lo <= temperature <= thresholds.temp_hi):
+            severity = "medium" if thresholds.temp_lo_crit <= temperature <= thresholds.temp_hi_crit else "high"
+            alerts.append({
+                "type": NotificationType.TEMPERATURE_EXTREME,
+                "severity": severity,
+                "message": f"Extreme temperature: {temperature:.2f}°C",
+                "value": temperature,
+                "threshold": [thresholds.temp_lo, thresholds.temp_hi]
+            })
         
         # Check TDS
-        if sensor_data.tds is not None and sensor_data.tds > settings.get("tds_threshold", 500):
+        if sensor_data.tds is not None and sensor_data.tds > thresholds.tds:
             alerts.append({
                 "type": NotificationType.TDS_HIGH,
                 "severity": "medium",
                 "message": f"High TDS level: {sensor_data.tds:.2f} ppm",
                 "value": sensor_data.tds,
-                "threshold": settings.get("tds_threshold", 500)
+                "threshold": thresholds.tds
             })
         
         # Check preservation level
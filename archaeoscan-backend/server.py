@@ -0,0 +1,74 @@
+import time
+import gradio as gr
+import requests
+from main import app as main_app
+
+# Reuse one connection pool for the API calls behind the buttons
+_http = requests.Session()
+
+# Last status probe as (monotonic time, result); clicks within the TTL reuse it
+STATUS_TTL = 1.0
+_status_cache = (float("-inf"), None)
+
+# Create Gradio interface
+def create_gradio_interface():
+    with gr.Blocks(title="ArchaeoScan Backend API") as demo:
+        gr.Markdown("# 🏺 ArchaeoScan Backend API")
+        
+        with gr.Tab("📊 API Status"):
+            gr.Markdown("### Backend API Status")
+            status_btn = gr.Button("Check Status")
+            status_output = gr.JSON(label="Status Response")
+            
+            def check_status():
+                global _status_cache
+                checked_at, status = _status_cache
+                if time.monotonic() - checked_at < STATUS_TTL:
+                    return status
+                
+                try:
+                    response = _http.get("http://localhost:7860/api/status", timeout=5)
+                    status = response.json()
+                except:
+                    status = {"error": "Backend not ready"}
+                
+                _status_cache = (time.monotonic(), status)
+                return status
+            
+            status_btn.click(check_status, outputs=status_output)
+        
+        with gr.Tab("🤖 AI Analysis"):
+            gr.Markdown("### AI Water & Material Analysis")
+            analyze_btn = gr.Button("Run AI Analysis")
+            analyze_output = gr.JSON(label="Analysis Results")
+            
+            def run_analysis():
+                try:
+                    response = _http.get("http://localhost:7860/api/ai/analyze", timeout=5)
+                    return response.json()
+                except:
+                    return {"error": "Analysis not ready"}
+            
+            analyze_btn.click(run_analysis, outputs=analyze_output)
+        
+        with gr.Tab("🗄️ Artifacts"):
+            gr.Markdown("### Artifacts Database")
+            artifacts_btn = gr.Button("Get Artifacts")
+            artifacts_output = gr.JSON(label="Artifacts Data")
+            
+            def get_artifacts():
+                try:
+                    response = _http.get("http://localhost:7860/api/artifacts", timeout=5)
+                    return response.json()
+                except:
+                    return {"error": "Artifacts not ready"}
+            
+            artifacts_btn.click(get_artifacts, outputs=artifacts_output)
+    
+    return demo
+
+# Create Gradio demo
+demo = create_gradio_interface()
+
+# Mount Gradio onto the backend app so API routes keep their native /api paths
+app = gr.mount_gradio_app(main_app, demo, path="/gradio")
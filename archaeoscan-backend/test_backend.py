@@ -7,6 +7,9 @@ from datetime import datetime
 import sys
 import os
 
+import numpy as np
+import orjson
+
 # Add the backend directory to the path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__)))
 
@@ -21,22 +24,19 @@ def test_material_classification():
     print("Testing material classification...")
     
     # Sample spectrometer data (simulated)
-    wavelengths = list(range(400, 1001, 10))  # From 400nm to 1000nm in 10nm increments
+    wavelengths = np.arange(400, 1001, 10)  # From 400nm to 1000nm in 10nm increments
     # Simulate a metallic signature (peaks at certain wavelengths)
-    intensities = []
-    for wl in wavelengths:
-        intensity = 0.1  # Base noise
-        if 650 <= wl <= 670:  # Simulate copper peak
-            intensity += 0.8
-        elif 290 <= wl <= 310:  # Simulate iron peak
-            intensity += 0.6
-        else:
-            # Add some random variation
-            import random
-            intensity += random.uniform(0, 0.1)
-        intensities.append(min(1.0, intensity))  # Cap at 1.0
-    
-    result = classify_material(wavelengths, intensities, {'temperature': 22.5, 'humidity': 45})
+    copper_peak = (wavelengths >= 650) & (wavelengths <= 670)
+    iron_peak = (wavelengths >= 290) & (wavelengths <= 310)
+    intensities = np.full(wavelengths.shape, 0.1)  # Base noise
+    intensities += np.where(copper_peak, 0.8, 0.0)
+    intensities += np.where(iron_peak, 0.6, 0.0)
+    # Add some random variation outside the peaks
+    noise = np.random.default_rng(0).uniform(0, 0.1, size=wavelengths.shape)
+    intensities += np.where(copper_peak | iron_peak, 0.0, noise)
+    np.minimum(intensities, 1.0, out=intensities)  # Cap at 1.0
+    
+    result = classify_material(wavelengths.tolist(), intensities.tolist(), {'temperature': 22.5, 'humidity': 45})
     print(f"  Result: {result}")
     print(f"  Material: {result['material_type']}, Confidence: {result['confidence']:.2f}")
     print("Material classification test completed.\n")
@@ -55,6 +55,67 @@ def test_radar_processing():
     print("Radar processing test completed.\n")
 
 
+def test_radar_endpoint():
+    """Test posting a radar reading that produces anomalies"""
+    print("Testing radar endpoint...")
+    from fastapi.testclient import TestClient
+    from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+    from sqlalchemy.pool import StaticPool
+    from app import db, models
+    from main import app
+    
+    # Store readings in a throwaway in-memory database, encoded like the app's
+    engine = create_async_engine(
+        "sqlite+aiosqlite://",
+        poolclass=StaticPool,
+        json_serializer=db._json_serializer,
+        json_deserializer=orjson.loads
+    )
+    
+    async def get_test_db():
+        async with engine.begin() as conn:
+            await conn.run_sync(models.Base.metadata.create_all)
+        async with async_sessionmaker(engine, expire_on_commit=False)() as session:
+            yield session
+    
+    app.dependency_overrides[db.get_async_db] = get_test_db
+    try:
+        client = TestClient(app)
+        # Short profiles skip filtering, so samples stay float32 through detection
+        response = client.post("/api/radar/process", json={
+            "timestamp": 1700000000000,
+            "anomalies": [],
+            "device_id": "test_radar",
+            "depth_profile": [0.1, 0.2, 0.15, 0.3, 0.8, 0.9, 0.85, 0.3, 0.2, 0.15, 0.1]
+        })
+        assert response.status_code == 200, response.text
+        result = response.json()
+        assert result["total_detected"] > 0
+        print(f"  Result: {result}")
+        
+        # A longer profile with several reflections; paging one anomaly at a time
+        # must walk the same sequence as the full listing
+        response = client.post("/api/radar/process", json={
+            "timestamp": 1700000000000,
+            "anomalies": [],
+            "device_id": "test_radar",
+            "depth_profile": np.sin(np.arange(64) / 3).tolist()
+        })
+        assert response.status_code == 200, response.text
+        total = result["total_detected"] + response.json()["total_detected"]
+        
+        anomalies = client.get("/api/radar/anomalies", params={"device_id": "test_radar"}).json()
+        assert len(anomalies) == total
+        pages = [
+            client.get("/api/radar/anomalies", params={"device_id": "test_radar", "skip": i, "limit": 1}).json()[0]
+            for i in range(total)
+        ]
+        assert pages == anomalies
+    finally:
+        app.dependency_overrides.pop(db.get_async_db, None)
+    print("Radar endpoint test completed.\n")
+
+
 def test_preservation_index():
     """Test the preservation index calculation"""
     print("Testing preservation index calculation...")
@@ -73,6 +134,84 @@ def test_preservation_index():
     print("Preservation index test completed.\n")
 
 
+def test_preservation_series_endpoint():
+    """Test that the preservation series scores one entry per stored reading"""
+    print("Testing preservation series endpoint...")
+    from fastapi.testclient import TestClient
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from sqlalchemy.pool import StaticPool
+    from app import db, models
+    from main import app
+    
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+        json_serializer=db._json_serializer
+    )
+    models.Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    
+    # Stored like ESP32 packets: one row per sensor, sharing the packet's timestamp
+    packets = [
+        ("esp32_a", datetime(2024, 1, 1, 12, 0),
+         {"temperature": 12.0, "tds": 300.0, "turbidity": 5.0, "distance": 1.5, "ph": 6.8}),
+        ("esp32_a", datetime(2024, 1, 1, 12, 1),
+         {"temperature": 25.0, "tds": 900.0, "turbidity": 40.0, "distance": 0.5, "ph": 5.5}),
+        ("esp32_b", datetime(2024, 1, 1, 12, 1), {"temperature": 18.0}),
+    ]
+    for device_id, timestamp, sensors in packets:
+        session.add(models.SensorReading(
+            timestamp=timestamp, sensor_type="magnetometer",
+            values_json={"x": 1.0, "y": 2.0, "z": 3.0}, device_id=device_id
+        ))
+        for sensor_type, value in sensors.items():
+            session.add(models.SensorReading(
+                timestamp=timestamp, sensor_type=sensor_type, value=value, device_id=device_id
+            ))
+    session.commit()
+    
+    def get_test_db():
+        yield session
+    
+    app.dependency_overrides[db.get_db] = get_test_db
+    try:
+        client = TestClient(app)
+        response = client.get("/api/sensors/preservation")
+        assert response.status_code == 200, response.text
+        series = response.json()
+        assert [(r["device_id"], r["timestamp"]) for r in series] == [
+            ("esp32_a", "2024-01-01T12:01:00"),
+            ("esp32_b", "2024-01-01T12:01:00"),
+            ("esp32_a", "2024-01-01T12:00:00"),
+        ]
+        
+        # Each entry matches the scalar index of its packet; missing factors use the defaults
+        expected = [packets[1][2], packets[2][2], packets[0][2]]
+        for reading, sensors in zip(series, expected):
+            assert reading["sensors"] == sensors
+            preservation_pct, _ = calculate_preservation_index(
+                temperature=sensors.get("temperature", 20.0),
+                tds=sensors.get("tds", 500.0),
+                turbidity=sensors.get("turbidity", 10.0),
+                depth=sensors.get("distance", 2.0),
+                ph=sensors.get("ph", 7.0)
+            )
+            assert abs(reading["preservation_percentage"] - preservation_pct) < 1e-6
+        
+        # Paging counts readings, not sensor rows
+        page = client.get("/api/sensors/preservation", params={"skip": 1, "limit": 1}).json()
+        assert page == series[1:2]
+        device = client.get("/api/sensors/preservation", params={"device_id": "esp32_a"}).json()
+        assert device == [series[0], series[2]]
+        print(f"  Series: {series}")
+    finally:
+        app.dependency_overrides.pop(db.get_db, None)
+        session.close()
+    print("Preservation series endpoint test completed.\n")
+
+
 async def test_websocket_simulation():
     """Test the WebSocket simulation"""
     print("Testing WebSocket simulation...")
@@ -96,14 +235,47 @@ async def test_websocket_simulation():
     print("WebSocket simulation test completed.\n")
 
 
+async def test_device_packets_not_coalesced():
+    """Test that simulated frames never replace queued device packets"""
+    print("Testing broadcast queueing...")
+    
+    class SlowClient:
+        """Fake WebSocket that takes a while to accept every message"""
+        def __init__(self):
+            self.received = []
+        
+        async def send(self, event):
+            await asyncio.sleep(0.3)
+            self.received.append(event["text"])
+    
+    client = SlowClient()
+    manager.active_connections.add(client)
+    try:
+        manager.publish('{"sim":0}', coalesce=True)
+        await asyncio.sleep(0.05)  # First frame is now in flight
+        manager.publish('{"esp32":1}')
+        manager.publish('{"sim":1}', coalesce=True)
+        manager.publish('{"sim":2}', coalesce=True)
+        await asyncio.sleep(1.2)
+        assert client.received == ['{"sim":0}', '{"esp32":1}', '{"sim":2}'], client.received
+    finally:
+        manager.disconnect(client)
+        manager.stop_broadcasting()
+    
+    print("Broadcast queueing test completed.\n")
+
+
 async def main():
     """Run all tests"""
     print("Starting ArchaeoScan Backend Tests...\n")
     
     test_material_classification()
     test_radar_processing()
+    test_radar_endpoint()
     test_preservation_index()
+    test_preservation_series_endpoint()
     await test_websocket_simulation()
+    await test_device_packets_not_coalesced()
     
     print("All tests completed successfully!")
 
@@ -1,5 +1,6 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, LargeBinary, JSON, Boolean
+from sqlalchemy import Column, Integer, String, Float, DateTime, LargeBinary, JSON, Boolean, Index
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import deferred
 from sqlalchemy.sql import func
 from datetime import datetime
 
@@ -47,19 +48,30 @@ class RadarReading(Base):
     battery_level = Column(Float)
     device_id = Column(String, index=True)
     
+    __table_args__ = (
+        # Match the per-device anomaly listing's ORDER BY timestamp DESC, id DESC
+        # so the newest rows are read straight off the index
+        Index("ix_radar_device_ts", "device_id", timestamp.desc(), id.desc()),
+    )
+    
 class CameraReading(Base):
     __tablename__ = "camera_readings"
     
     id = Column(Integer, primary_key=True, index=True)
     timestamp = Column(DateTime(timezone=True), server_default=func.now(), index=True)
-    image_data = Column(LargeBinary)  # Binary image data
-    image_base64 = Column(String)  # Base64 encoded image
+    image_data = deferred(Column(LargeBinary))  # JPEG bytes, only loaded when accessed
+    image_base64 = deferred(Column(String))  # Legacy rows written before image_data was stored; read-only fallback
     location_lat = Column(Float)
     location_lng = Column(Float)
     accuracy = Column(Float)
     battery_level = Column(Float)
     device_id = Column(String, index=True)
     
+    __table_args__ = (
+        # Latest-image-per-device lookups become an index seek
+        Index("ix_camera_device_ts", "device_id", timestamp.desc()),
+    )
+    
 class MaterialClassification(Base):
     __tablename__ = "material_classifications"
     
@@ -119,4 +131,11 @@ class Report(Base):
     location_lat = Column(Float)
     location_lng = Column(Float)
     device_id = Column(String, index=True)
-    generated_by_ai = Column(Boolean, default=False)
\ No newline at end of file
+    generated_by_ai = Column(Boolean, default=False)
+    
+class AppSetting(Base):
+    __tablename__ = "app_settings"
+    
+    key = Column(String, primary_key=True)  # websocketUrl, esp32Ip, units
+    value = Column(JSON)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -3,6 +3,7 @@ from pydantic import BaseModel
 from typing import List, Optional, Tuple
 from datetime import datetime
 import random
+import orjson
 
 router = APIRouter()
 
@@ -57,15 +58,24 @@ artifacts_db = [
     }
 ]
 
+# Index artifacts by ID so lookups and inserts don't scan the whole list
+_artifacts_by_id = {a["id"]: a for a in artifacts_db}
+_next_id = max(_artifacts_by_id) + 1 if _artifacts_by_id else 1
+
+# Bumped on every write so cached exports know when they are stale
+_db_version = 0
+_csv_cache = None  # (db_version, csv_content)
+_json_cache = None  # (db_version, json_bytes)
+
 @router.get("/", response_model=ArtifactsResponse)
 async def get_artifacts():
     """Get all artifacts"""
-    return {"artifacts": artifacts_db}
+    return {"artifacts": list(_artifacts_by_id.values())}
 
 @router.get("/{artifact_id}", response_model=Artifact)
 async def get_artifact(artifact_id: int):
     """Get specific artifact by ID"""
-    artifact = next((a for a in artifacts_db if a["id"] == artifact_id), None)
+    artifact = _artifacts_by_id.get(artifact_id)
     if not artifact:
         raise HTTPException(status_code=404, detail="Artifact not found")
     return artifact
@@ -73,15 +83,33 @@ async def get_artifact(artifact_id: int):
 @router.post("/", response_model=Artifact)
 async def create_artifact(artifact: Artifact):
     """Create new artifact"""
+    global _next_id, _db_version
+    
     # Generate new ID
-    new_id = max([a["id"] for a in artifacts_db]) + 1 if artifacts_db else 1
-    artifact.id = new_id
-    artifacts_db.append(artifact.dict())
+    artifact.id = _next_id
+    _next_id += 1
+    _artifacts_by_id[artifact.id] = artifact.dict()
+    _db_version += 1
     return artifact
 
 @router.get("/export/csv")
 async def export_artifacts_csv():
     """Export artifacts as CSV"""
+    from fastapi.responses import Response
+    global _csv_cache
+    
+    # Serve the cached export if nothing has changed since it was built
+    if _csv_cache is None or _csv_cache[0] != _db_version:
+        _csv_cache = (_db_version, _build_artifacts_csv())
+    
+    return Response(
+        content=_csv_cache[1],
+        media_type="text/csv",
+        headers={"Content-Disposition": "attachment; filename=artifacts.csv"}
+    )
+
+def _build_artifacts_csv() -> str:
+    """Render all artifacts as CSV text"""
     import csv
     import io
     
@@ -92,7 +120,7 @@ async def export_artifacts_csv():
     writer.writerow(["ID", "Latitude", "Longitude", "Material", "Confidence", "Date", "Depth", "Description", "Status"])
     
     # Write data
-    for artifact in artifacts_db:
+    for artifact in _artifacts_by_id.values():
         writer.writerow([
             artifact["id"],
             artifact["location"][0],
@@ -105,19 +133,19 @@ async def export_artifacts_csv():
             artifact["status"]
         ])
     
-    # Return CSV content
-    from fastapi.responses import Response
-    return Response(
-        content=output.getvalue(),
-        media_type="text/csv",
-        headers={"Content-Disposition": "attachment; filename=artifacts.csv"}
-    )
+    return output.getvalue()
 
 @router.get("/export/json")
 async def export_artifacts_json():
     """Export artifacts as JSON"""
-    from fastapi.responses import JSONResponse
-    return JSONResponse(
-        content=artifacts_db,
+    from fastapi.responses import Response
+    global _json_cache
+    
+    if _json_cache is None or _json_cache[0] != _db_version:
+        _json_cache = (_db_version, orjson.dumps(list(_artifacts_by_id.values())))
+    
+    return Response(
+        content=_json_cache[1],
+        media_type="application/json",
         headers={"Content-Disposition": "attachment; filename=artifacts.json"}
     )
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, WebSocket
 from sqlalchemy.orm import Session
 from typing import Optional
 from datetime import datetime
@@ -7,9 +7,46 @@ from app import models, db
 from app.schemas import (
     ControlCommand
 )
+from app.websocket import device_status_channel
 
 router = APIRouter()
 
+ALL_SENSORS = (
+    "temperature", "humidity", "pressure", "tds", "turbidity", 
+    "distance", "magnetometer", "accelerometer", "gyroscope", 
+    "spectrometer", "radar", "camera"
+)
+
+# Control state every device starts from; copied per device, never mutated
+_DEFAULT_DEVICE_STATE = {
+    "scan_active": False,
+    "calibration_pending": False,
+    "power_mode": "normal",
+    "connected_sensors": ALL_SENSORS,
+    "last_command": "none",
+    "last_command_time": None
+}
+
+# Current control state per device (in a real app, this would come from the devices)
+_device_states = {}
+
+def _get_device_state(device_id: str) -> dict:
+    """Get the control state of a device, creating the default state on first use"""
+    state = _device_states.get(device_id)
+    if state is None:
+        state = _device_states[device_id] = {**_DEFAULT_DEVICE_STATE}
+    return state
+
+def _update_device_state(device_id: str, command: str, timestamp: str, **changes):
+    """Record a command against a device and push the new state to subscribers"""
+    state = _get_device_state(device_id)
+    state.update(changes, last_command=command, last_command_time=timestamp)
+    device_status_channel.publish({
+        "type": "device_status",
+        "device_id": device_id,
+        "status": state
+    })
+
 @router.post("/control")
 def send_control_command(control_cmd: ControlCommand):
     """
@@ -17,12 +54,14 @@ def send_control_command(control_cmd: ControlCommand):
     """
     # In a real implementation, this would send the command to the physical device
     # For now, we'll just return a success message
+    timestamp = datetime.utcnow().isoformat()
+    _update_device_state("default_device", control_cmd.command, timestamp)
     return {
         "message": f"Control command '{control_cmd.command}' executed successfully",
         "command": control_cmd.command,
         "parameters": control_cmd.parameters,
         "status": "executed",
-        "timestamp": datetime.utcnow().isoformat()
+        "timestamp": timestamp
     }
 
 @router.post("/control/start-scan")
@@ -34,12 +73,14 @@ def start_scan(
     """
     # In a real implementation, this would initiate a scan on the physical device
     # For now, we'll just return a success message
+    now = datetime.utcnow()
+    _update_device_state("default_device", "start_scan", now.isoformat(), scan_active=True)
     return {
         "message": "Scan started successfully",
-        "scan_id": "scan_" + str(int(datetime.utcnow().timestamp())),
+        "scan_id": "scan_" + str(int(now.timestamp())),
         "parameters": scan_params or {},
         "status": "active",
-        "start_time": datetime.utcnow().isoformat()
+        "start_time": now.isoformat()
     }
 
 @router.post("/control/stop-scan")
@@ -51,11 +92,13 @@ def stop_scan(
     """
     # In a real implementation, this would stop a scan on the physical device
     # For now, we'll just return a success message
+    timestamp = datetime.utcnow().isoformat()
+    _update_device_state("default_device", "stop_scan", timestamp, scan_active=False)
     return {
         "message": "Scan stopped successfully",
         "scan_id": scan_id,
         "status": "stopped",
-        "stop_time": datetime.utcnow().isoformat()
+        "stop_time": timestamp
     }
 
 @router.post("/control/reset-device")
@@ -67,11 +110,13 @@ def reset_device(
     """
     # In a real implementation, this would reset the physical device
     # For now, we'll just return a success message
+    timestamp = datetime.utcnow().isoformat()
+    _update_device_state(device_id, "reset", timestamp, scan_active=False, calibration_pending=False)
     return {
         "message": f"Device {device_id} reset successfully",
         "device_id": device_id,
         "status": "reset",
-        "timestamp": datetime.utcnow().isoformat()
+        "timestamp": timestamp
     }
 
 @router.post("/control/calibrate-all")
@@ -81,15 +126,13 @@ def calibrate_all_sensors():
     """
     # In a real implementation, this would send calibration commands to all sensors
     # For now, we'll just return a success message
+    timestamp = datetime.utcnow().isoformat()
+    _update_device_state("default_device", "calibrate_all", timestamp, calibration_pending=True)
     return {
         "message": "Calibration of all sensors initiated",
-        "calibrated_sensors": [
-            "temperature", "humidity", "pressure", "tds", "turbidity", 
-            "distance", "magnetometer", "accelerometer", "gyroscope", 
-            "spectrometer", "radar", "camera"
-        ],
+        "calibrated_sensors": ALL_SENSORS,
         "status": "calibrating",
-        "timestamp": datetime.utcnow().isoformat()
+        "timestamp": timestamp
     }
 
 @router.get("/control/device-status")
@@ -101,16 +144,12 @@ def get_device_control_status(
     """
     return {
         "device_id": device_id,
-        "status": {
-            "scan_active": False,
-            "calibration_pending": False,
-            "power_mode": "normal",
-            "connected_sensors": [
-                "temperature", "humidity", "pressure", "tds", "turbidity", 
-                "distance", "magnetometer", "accelerometer", "gyroscope", 
-                "spectrometer", "radar", "camera"
-            ],
-            "last_command": "none",
-            "last_command_time": None
-        }
-    }
\ No newline at end of file
+        "status": _get_device_state(device_id)
+    }
+
+@router.websocket("/ws/device-status")
+async def device_status_websocket(websocket: WebSocket):
+    """
+    Push device control status whenever a control command changes it.
+    """
+    await device_status_channel.serve(websocket)
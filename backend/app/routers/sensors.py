@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import case, func
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import datetime, timedelta
@@ -14,7 +15,10 @@ from app.schemas import (
     MaterialClassificationRequest, PreservationIndexRequest, ReportRequest,
     CalibrationResponse, ReportResponse, TimeRangeFilter, AnalysisResult
 )
-from app.services.preservation_index import calculate_multi_point_preservation
+from app.services.preservation_index import (
+    READING_COLUMNS, calculate_multi_point_preservation, calculate_reading_preservation,
+    get_preservation_recommendations
+)
 from app.services.material_classification import classify_material
 from app.websocket import manager, SensorData
 from datetime import datetime
@@ -85,6 +89,65 @@ def get_historical_sensor_data(
         total_count=total_count
     )
 
+@router.get("/sensors/preservation")
+def get_preservation_series(
+    start_time: Optional[datetime] = Query(None, description="Start time for filtering"),
+    end_time: Optional[datetime] = Query(None, description="End time for filtering"),
+    device_id: Optional[str] = Query(None, description="Device ID to filter"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, le=1000),
+    db: Session = Depends(db.get_db)
+):
+    """
+    Get the preservation index of each stored reading, newest first, for time-series views.
+    A reading is one device's preservation factors sharing a timestamp (one ESP32 packet);
+    factors a reading does not report use the multi-point defaults.
+    """
+    # Pivot the per-sensor rows into one row per reading, so paging counts readings
+    query = db.query(
+        models.SensorReading.timestamp,
+        models.SensorReading.device_id,
+        *(
+            func.max(case(
+                (models.SensorReading.sensor_type == sensor_type, models.SensorReading.value)
+            ))
+            for sensor_type in READING_COLUMNS
+        )
+    ).filter(models.SensorReading.sensor_type.in_(READING_COLUMNS))
+    
+    if start_time:
+        query = query.filter(models.SensorReading.timestamp >= start_time)
+    if end_time:
+        query = query.filter(models.SensorReading.timestamp <= end_time)
+    if device_id:
+        query = query.filter(models.SensorReading.device_id == device_id)
+    
+    rows = query.group_by(
+        models.SensorReading.timestamp, models.SensorReading.device_id
+    ).order_by(
+        models.SensorReading.timestamp.desc(), models.SensorReading.device_id
+    ).offset(skip).limit(limit).all()
+    
+    readings = [
+        {
+            'timestamp': timestamp,
+            'device_id': reading_device_id,
+            'sensors': {
+                sensor_type: value
+                for sensor_type, value in zip(READING_COLUMNS, values)
+                if value is not None
+            }
+        }
+        for timestamp, reading_device_id, *values in rows
+    ]
+    
+    # All readings of the page are scored in one vectorized pass
+    preservation = calculate_reading_preservation(readings)
+    for reading, percentage in zip(readings, preservation.tolist()):
+        reading['preservation_percentage'] = percentage
+    
+    return readings
+
 @router.post("/sensors/esp32")
 def create_esp32_sensor_reading(
     sensor_data: dict,
@@ -526,7 +589,9 @@ def generate_analysis_report(
             'sensor_types_covered': list(set([sr.sensor_type for sr in sensor_readings]))
         },
         'preservation_analysis': preservation_result,
-        'recommendations': []  # Would come from preservation service
+        'recommendations': list(
+            get_preservation_recommendations(preservation_result['preservation_percentage'])
+        ) if sensor_readings else []
     }
     
     # Create report entry
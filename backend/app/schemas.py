@@ -75,9 +75,8 @@ class SpectrometerReadingResponse(BaseModel):
     battery_level: Optional[float] = None
     device_id: str
 
-class RadarReadingRequest(BaseModel):
+class RadarReadingMetadata(BaseModel):
     timestamp: int
-    depth_profile: List[float]
     anomalies: List[Dict[str, Any]]
     location_lat: Optional[float] = None
     location_lng: Optional[float] = None
@@ -85,6 +84,9 @@ class RadarReadingRequest(BaseModel):
     battery_level: Optional[float] = None
     device_id: str
 
+class RadarReadingRequest(RadarReadingMetadata):
+    depth_profile: List[float]
+
 class RadarReadingResponse(BaseModel):
     id: int
     timestamp: datetime
@@ -116,6 +118,15 @@ class CameraReadingResponse(BaseModel):
     battery_level: Optional[float] = None
     device_id: str
 
+class CameraReadingMetaResponse(BaseModel):
+    id: int
+    timestamp: datetime
+    location_lat: Optional[float] = None
+    location_lng: Optional[float] = None
+    accuracy: Optional[float] = None
+    battery_level: Optional[float] = None
+    device_id: str
+
 class MaterialClassificationRequest(BaseModel):
     spectrometer_reading_id: int
     material_type: MaterialType
@@ -136,6 +147,17 @@ class MaterialClassificationResponse(BaseModel):
     location_lng: Optional[float] = None
     device_id: str
 
+class BatchClassificationRequest(BaseModel):
+    wavelengths: List[List[float]]
+    intensities: List[List[float]]
+    environmental_context: Optional[Dict[str, Any]] = None
+
+class BatchClassificationResult(BaseModel):
+    material_type: MaterialType
+    confidence: float
+    all_probabilities: Dict[str, float]
+    is_reliable: bool
+
 class PreservationIndexRequest(BaseModel):
     location_lat: float
     location_lng: float
@@ -1,6 +1,11 @@
 import numpy as np
+import hashlib
+import os
+import joblib
+import threading
+from collections import OrderedDict
 from typing import Dict, List, Tuple, Optional
-from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
 from sklearn.preprocessing import StandardScaler
 from sklearn.model_selection import train_test_split
 import pickle
@@ -9,6 +14,85 @@ from datetime import datetime
 import warnings
 warnings.filterwarnings('ignore')
 
+# Spectra are processed in single precision: the spectrometer ADC resolves
+# 14-16 bits, so float64 only doubles memory traffic
+SPECTRUM_DTYPE = np.float32
+
+# Number of features produced by _featurize
+N_SPECTRUM_FEATURES = 9
+
+# Trained classifier and scaler are persisted here so restarts skip training
+MODEL_PATH = os.getenv("MATERIAL_MODEL_PATH", "material_model.joblib")
+
+# Predictions remembered per quantized spectrum, and the rounding used for the key
+PREDICTION_CACHE_SIZE = 4096
+PREDICTION_CACHE_DECIMALS = 3
+
+def _peak_mask(intensities: np.ndarray, threshold: float = 0.3) -> np.ndarray:
+    """
+    Mark interior samples higher than both neighbours and above the threshold.
+    Works along the last axis, so a (N, L) batch gives a (N, L-2) mask.
+    """
+    center = intensities[..., 1:-1]
+    # Two buffers for the three comparisons: the mask, and a scratch array
+    # each later comparison writes into before being and-ed in place
+    mask = np.greater(center, intensities[..., :-2])
+    scratch = np.empty_like(mask)
+    mask &= np.greater(center, intensities[..., 2:], out=scratch)
+    mask &= np.greater(center, threshold, out=scratch)
+    return mask
+
+def _find_peaks(intensities: np.ndarray, threshold: float = 0.3) -> np.ndarray:
+    """
+    Positions of samples higher than both neighbours and above the threshold.
+    """
+    return np.nonzero(_peak_mask(intensities, threshold))[0] + 1
+
+def _featurize(wavelengths: np.ndarray, intensities: np.ndarray, flat: np.ndarray) -> np.ndarray:
+    """
+    Compute the statistical, peak and slope features of normalized spectra.
+    
+    Args:
+        wavelengths: SPECTRUM_DTYPE wavelength values, shape (L,)
+        intensities: SPECTRUM_DTYPE intensities min-max normalized to 0-1, shape (N, L)
+        flat: Boolean per spectrum, True where it was constant and normalized to all zeros
+        
+    Returns:
+        Array of shape (N, N_SPECTRUM_FEATURES), in the dtype of intensities
+    """
+    features = np.zeros((intensities.shape[0], N_SPECTRUM_FEATURES), dtype=intensities.dtype)
+    length = intensities.shape[1]
+    
+    # Statistical features: mean, std, max, min, median intensity.
+    # Mean and std come from one sum and one sum of squares; after min-max
+    # normalization the max is 1 (0 for flat spectra) and the min is 0.
+    sums = intensities.sum(axis=1)
+    squares = np.einsum('ij,ij->i', intensities, intensities)
+    means = sums / length
+    features[:, 0] = means
+    features[:, 1] = np.sqrt(np.maximum(squares / length - means ** 2, 0))
+    features[:, 2] = np.where(flat, 0.0, 1.0)
+    features[:, 4] = np.median(intensities, axis=1)
+    
+    # Peak detection features: count, average position, spread
+    mask = _peak_mask(intensities)
+    if mask.shape[1]:
+        positions = np.arange(1, mask.shape[1] + 1)
+        counts = mask.sum(axis=1)
+        has_peaks = counts > 0
+        safe_counts = np.maximum(counts, 1)
+        means = (mask * positions).sum(axis=1) / safe_counts
+        spreads = np.sqrt((mask * (positions - means[:, None]) ** 2).sum(axis=1) / safe_counts)
+        features[:, 5] = counts
+        features[:, 6] = np.where(has_peaks, means, 0)
+        features[:, 7] = np.where(has_peaks, spreads, 0)
+    
+    # Spectral slope
+    if wavelengths.size > 1:
+        features[:, 8] = (intensities[:, -1] - intensities[:, 0]) / (wavelengths[-1] - wavelengths[0])
+    
+    return features
+
 class MaterialClassifier:
     """
     AI service for classifying archaeological materials based on spectrometer readings
@@ -16,11 +100,16 @@ class MaterialClassifier:
     """
     
     def __init__(self):
-        self.classifier = RandomForestClassifier(n_estimators=100, random_state=42)
+        # A linear model: prediction is one matrix product, and probabilities stay calibrated
+        self.classifier = LogisticRegression(max_iter=1000)
         self.scaler = StandardScaler()
         self.is_trained = False
         self.classes = ['metal', 'ceramic', 'organic', 'stone', 'unknown']
         
+        # LRU of (predicted class, probabilities) keyed by spectrum digest
+        self._prediction_cache = OrderedDict()
+        self._prediction_cache_lock = threading.Lock()
+        
         # Predefined reference spectra for different materials
         self.reference_signatures = {
             'metal': {
@@ -45,6 +134,15 @@ class MaterialClassifier:
             }
         }
         
+        # (start, end) wavelength bands behind the material-specific features:
+        # the fe, si and ch peak of each signature, NaN where a signature has none,
+        # limited to 9 features to keep a consistent shape
+        self._band_array = np.array([
+            signature.get(peak, (np.nan, np.nan))
+            for signature in self.reference_signatures.values()
+            for peak in ('fe_peak', 'si_peak', 'ch_peak')
+        ][:9], dtype=SPECTRUM_DTYPE)
+        
     def preprocess_spectrum(self, wavelengths: List[float], intensities: List[float]) -> np.ndarray:
         """
         Preprocess spectrometer data for classification.
@@ -56,44 +154,34 @@ class MaterialClassifier:
         Returns:
             Normalized feature vector ready for classification
         """
-        # Convert to numpy arrays
-        wavelengths = np.array(wavelengths)
-        intensities = np.array(intensities)
-        
-        # Normalize intensities to 0-1 range
-        if intensities.max() != intensities.min():
-            intensities = (intensities - intensities.min()) / (intensities.max() - intensities.min())
-        else:
-            intensities = np.zeros_like(intensities)
-        
-        # Extract key features from spectrum
-        features = []
-        
-        # Statistical features
-        features.append(np.mean(intensities))  # Average intensity
-        features.append(np.std(intensities))   # Intensity variation
-        features.append(np.max(intensities))   # Peak intensity
-        features.append(np.min(intensities))   # Minimum intensity
-        features.append(np.median(intensities)) # Median intensity
-        
-        # Peak detection features (simplified)
-        peaks = self.find_peaks(intensities)
-        features.append(len(peaks))  # Number of peaks
-        features.append(np.mean(peaks) if peaks else 0)  # Average peak position
-        features.append(np.std(peaks) if peaks else 0)   # Peak distribution
-        
-        # Spectral slope
-        if len(wavelengths) > 1:
-            slope = (intensities[-1] - intensities[0]) / (wavelengths[-1] - wavelengths[0])
-            features.append(slope)
-        else:
-            features.append(0)
-        
-        # Material-specific features
-        material_features = self.extract_material_features(wavelengths, intensities)
-        features.extend(material_features)
+        return self.preprocess_spectra(wavelengths, [intensities])
+    
+    def preprocess_spectra(self, wavelengths: List[float], intensities: np.ndarray) -> np.ndarray:
+        """
+        Preprocess a batch of spectra sampled at the same wavelengths.
         
-        return np.array(features).reshape(1, -1)
+        Args:
+            wavelengths: Wavelength values shared by all spectra
+            intensities: Intensity values, one row per spectrum
+            
+        Returns:
+            Feature matrix with one row per spectrum
+        """
+        # Convert to numpy arrays
+        wavelengths = np.asarray(wavelengths, dtype=SPECTRUM_DTYPE)
+        intensities = np.asarray(intensities, dtype=SPECTRUM_DTYPE)
+        
+        # Normalize each spectrum to 0-1 range; flat spectra become all zeros
+        low = intensities.min(axis=1, keepdims=True)
+        span = intensities.max(axis=1, keepdims=True) - low
+        flat = span == 0
+        intensities = np.divide(intensities - low, span, out=np.zeros_like(intensities), where=~flat)
+        
+        # Statistical, peak and slope features, then material-specific features
+        return np.hstack((
+            _featurize(wavelengths, intensities, flat[:, 0]),
+            self.extract_material_features(wavelengths, intensities)
+        ))
     
     def find_peaks(self, intensities: np.ndarray, threshold: float = 0.3) -> List[int]:
         """
@@ -106,68 +194,54 @@ class MaterialClassifier:
         Returns:
             List of peak positions
         """
-        peaks = []
-        for i in range(1, len(intensities) - 1):
-            if intensities[i] > intensities[i-1] and intensities[i] > intensities[i+1] and intensities[i] > threshold:
-                peaks.append(i)
-        return peaks
+        return _find_peaks(np.asarray(intensities), threshold).tolist()
     
-    def extract_material_features(self, wavelengths: np.ndarray, intensities: np.ndarray) -> List[float]:
+    def extract_material_features(self, wavelengths: np.ndarray, intensities: np.ndarray) -> np.ndarray:
         """
         Extract material-specific features based on known absorption/emission peaks.
         
         Args:
             wavelengths: Wavelength values
-            intensities: Intensity values
+            intensities: Intensity values, one row per spectrum
             
         Returns:
-            List of material-specific features
-        """
-        features = []
-        
-        # Check for characteristic peaks for each material type
-        for mat_type, signature in self.reference_signatures.items():
-            if 'fe_peak' in signature:
-                fe_start, fe_end = signature['fe_peak']
-                fe_intensity = self.get_peak_intensity(wavelengths, intensities, fe_start, fe_end)
-                features.append(fe_intensity)
-            else:
-                features.append(0)  # No applicable peak
-                
-            if 'si_peak' in signature:
-                si_start, si_end = signature['si_peak']
-                si_intensity = self.get_peak_intensity(wavelengths, intensities, si_start, si_end)
-                features.append(si_intensity)
-            else:
-                features.append(0)
-                
-            if 'ch_peak' in signature:
-                ch_start, ch_end = signature['ch_peak']
-                ch_intensity = self.get_peak_intensity(wavelengths, intensities, ch_start, ch_end)
-                features.append(ch_intensity)
-            else:
-                features.append(0)
-        
-        return features[:9]  # Limit to 9 features to keep consistent shape
+            Material-specific features, one row per spectrum
+        """
+        # Bands are located by binary search, which needs ascending wavelengths
+        if np.any(wavelengths[1:] < wavelengths[:-1]):
+            order = np.argsort(wavelengths, kind='stable')
+            wavelengths, intensities = wavelengths[order], intensities[..., order]
+        
+        # Column range of every band from two binary searches instead of a mask per band;
+        # absent bands are NaN, which sorts past the end and gives an empty range
+        lows = np.searchsorted(wavelengths, self._band_array[:, 0], side='left')
+        highs = np.searchsorted(wavelengths, self._band_array[:, 1], side='right')
+        
+        # Maximum intensity in each band, 0 where the band holds no samples
+        features = np.zeros(intensities.shape[:-1] + (len(self._band_array),), dtype=intensities.dtype)
+        for band, (low, high) in enumerate(zip(lows, highs)):
+            if high > low:
+                features[..., band] = intensities[..., low:high].max(axis=-1)
+        return features
     
-    def get_peak_intensity(self, wavelengths: np.ndarray, intensities: np.ndarray, start: float, end: float) -> float:
+    def get_peak_intensity(self, wavelengths: np.ndarray, intensities: np.ndarray, start: float, end: float) -> np.ndarray:
         """
         Get the maximum intensity within a specific wavelength range.
         
         Args:
             wavelengths: Array of wavelength values
-            intensities: Array of intensity values
+            intensities: Array of intensity values, one row per spectrum
             start: Start wavelength
             end: End wavelength
             
         Returns:
-            Maximum intensity in the specified range
+            Maximum intensity in the specified range for each spectrum
         """
         mask = (wavelengths >= start) & (wavelengths <= end)
         if np.any(mask):
-            return np.max(intensities[mask])
+            return intensities[..., mask].max(axis=-1)
         else:
-            return 0.0
+            return np.zeros(intensities.shape[:-1])
     
     def prepare_training_data(self) -> Tuple[np.ndarray, np.ndarray]:
         """
@@ -178,52 +252,35 @@ class MaterialClassifier:
             Tuple of (features, labels)
         """
         # This is a simplified approach - in reality, you'd have real training data
-        X = []
-        y = []
-        
-        # Generate synthetic examples for each material type
-        for material in self.classes[:-1]:  # Exclude 'unknown' for training
-            for _ in range(50):  # 50 examples per material
-                # Create synthetic spectrum based on reference signature
-                wavelengths = np.linspace(400, 1000, 100)  # 100 wavelength points
-                intensities = np.random.random(100) * 0.1  # Base noise
-                
-                # Add characteristic peaks for this material
-                if material == 'metal':
-                    # Add iron and copper peaks
-                    peak_pos_fe = np.random.randint(29, 31)  # scaled to our 100-point range
-                    peak_pos_cu = np.random.randint(65, 67)
-                    intensities[peak_pos_fe] += 0.8
-                    intensities[peak_pos_cu] += 0.6
-                elif material == 'ceramic':
-                    # Add silica and aluminum peaks
-                    peak_pos_si = np.random.randint(90, 100)
-                    peak_pos_al = np.random.randint(45, 47)
-                    intensities[peak_pos_si] += 0.7
-                    intensities[peak_pos_al] += 0.5
-                elif material == 'organic':
-                    # Add carbon-hydrogen and hydroxyl peaks
-                    peak_pos_ch = np.random.randint(60, 70)
-                    peak_pos_oh = np.random.randint(90, 95)
-                    intensities[peak_pos_ch] += 0.6
-                    intensities[peak_pos_oh] += 0.7
-                elif material == 'stone':
-                    # Add calcium carbonate and silicon-oxygen peaks
-                    peak_pos_caco3 = np.random.randint(40, 50)
-                    peak_pos_sio = np.random.randint(67, 80)
-                    intensities[peak_pos_caco3] += 0.6
-                    intensities[peak_pos_sio] += 0.7
-                
-                # Add some noise and variation
-                intensities += np.random.normal(0, 0.05, intensities.shape)
-                intensities = np.clip(intensities, 0, 1)  # Keep in 0-1 range
-                
-                # Preprocess to get features
-                features = self.preprocess_spectrum(wavelengths.tolist(), intensities.tolist()).flatten()
-                X.append(features)
-                y.append(material)
-        
-        return np.array(X), np.array(y)
+        rng = np.random.default_rng(42)
+        materials = self.classes[:-1]  # Exclude 'unknown' for training
+        per_material = 50  # 50 examples per material
+        n_samples = per_material * len(materials)
+        
+        # Generate all synthetic spectra at once: 100 wavelength points of base noise each
+        wavelengths = np.linspace(400, 1000, 100, dtype=SPECTRUM_DTYPE)
+        intensities = rng.random((n_samples, 100), dtype=SPECTRUM_DTYPE) * 0.1
+        
+        # Characteristic peaks per material as (low, high) column range and height,
+        # scaled to our 100-point range
+        peak_specs = {
+            'metal': [((29, 31), 0.8), ((65, 67), 0.6)],      # Iron and copper
+            'ceramic': [((90, 100), 0.7), ((45, 47), 0.5)],   # Silica and aluminum
+            'organic': [((60, 70), 0.6), ((90, 95), 0.7)],    # Carbon-hydrogen and hydroxyl
+            'stone': [((40, 50), 0.6), ((67, 80), 0.7)]       # Calcium carbonate and silicon-oxygen
+        }
+        for index, material in enumerate(materials):
+            rows = np.arange(index * per_material, (index + 1) * per_material)
+            for (low, high), height in peak_specs[material]:
+                intensities[rows, rng.integers(low, high, size=per_material)] += height
+        
+        # Add some noise and variation
+        intensities += rng.normal(0, 0.05, intensities.shape).astype(SPECTRUM_DTYPE)
+        np.clip(intensities, 0, 1, out=intensities)  # Keep in 0-1 range
+        
+        X = self.preprocess_spectra(wavelengths, intensities)
+        y = np.repeat(materials, per_material)
+        return X, y
     
     def train(self):
         """
@@ -235,9 +292,9 @@ class MaterialClassifier:
         # Split data
         X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
         
-        # Scale features
-        X_train_scaled = self.scaler.fit_transform(X_train)
-        X_test_scaled = self.scaler.transform(X_test)
+        # Scale features, keeping them in single precision
+        X_train_scaled = self.scaler.fit_transform(X_train).astype(SPECTRUM_DTYPE, copy=False)
+        X_test_scaled = self.scaler.transform(X_test).astype(SPECTRUM_DTYPE, copy=False)
         
         # Train classifier
         self.classifier.fit(X_train_scaled, y_train)
@@ -248,34 +305,141 @@ class MaterialClassifier:
         
         print(f"Training completed. Train accuracy: {train_accuracy:.2f}, Test accuracy: {test_accuracy:.2f}")
         self.is_trained = True
+        
+        # Cached predictions came from the previous model
+        with self._prediction_cache_lock:
+            self._prediction_cache.clear()
     
-    def predict_material(self, wavelengths: List[float], intensities: List[float], 
-                         environmental_context: Optional[Dict] = None) -> Dict[str, any]:
+    def save(self, path: str = MODEL_PATH):
         """
-        Predict material type from spectrometer data.
+        Persist the classifier and scaler uncompressed, so workers can memory-map them.
+        
+        Args:
+            path: Location of the persisted model
+        """
+        # Write beside the target and rename, so a worker never loads a partial file
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        joblib.dump((self.classifier, self.scaler), temp_path, compress=False)
+        os.replace(temp_path, path)
+    
+    def load_or_train(self, path: str = MODEL_PATH):
+        """
+        Load the persisted classifier and scaler, training and saving them if missing.
+        The arrays are memory-mapped read-only, so worker processes share one copy
+        through the page cache.
+        
+        Args:
+            path: Location of the persisted model
+        """
+        if os.path.exists(path):
+            try:
+                classifier, scaler = joblib.load(path, mmap_mode='r')
+                if not isinstance(classifier, type(self.classifier)):
+                    raise TypeError(f"saved model is a {type(classifier).__name__}")
+                self.classifier, self.scaler = classifier, scaler
+                self.is_trained = True
+                with self._prediction_cache_lock:
+                    self._prediction_cache.clear()
+                print(f"Loaded material classifier from {path}")
+                return
+            except Exception as e:
+                print(f"Could not load material classifier from {path}, retraining: {e}")
+        
+        self.train()
+        try:
+            self.save(path)
+        except OSError as e:
+            print(f"Could not save material classifier to {path}: {e}")
+    
+    def _spectrum_key(self, wavelengths: np.ndarray, intensities: np.ndarray) -> bytes:
+        """
+        Digest of a spectrum rounded to PREDICTION_CACHE_DECIMALS, used as the cache key.
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(np.array(intensities.shape + wavelengths.shape).tobytes())
+        digest.update(np.round(intensities, PREDICTION_CACHE_DECIMALS).tobytes())
+        digest.update(np.round(wavelengths, PREDICTION_CACHE_DECIMALS).tobytes())
+        return digest.digest()
+    
+    def classify_spectrum(self, wavelengths: List[float], intensities: List[float]) -> Tuple[str, Tuple[float, ...]]:
+        """
+        Run the classifier on a spectrum, reusing the result for repeated sweeps.
         
         Args:
             wavelengths: List of wavelength values
             intensities: List of corresponding intensity values
-            environmental_context: Additional context like temperature, humidity, etc.
             
         Returns:
-            Dictionary with prediction results
+            Tuple of (predicted class, probabilities in classifier.classes_ order)
         """
-        if not self.is_trained:
-            self.train()
-        
-        # Preprocess the spectrum
-        features = self.preprocess_spectrum(wavelengths, intensities)
-        
-        # Scale features
-        features_scaled = self.scaler.transform(features)
+        return self.classify_spectra([wavelengths], [intensities])[0]
+    
+    def classify_spectra(self, wavelengths: List[List[float]],
+                         intensities: List[List[float]]) -> List[Tuple[str, Tuple[float, ...]]]:
+        """
+        Run the classifier on several spectra with a single predict_proba call,
+        reusing cached results for repeated sweeps.
         
-        # Make prediction
-        predicted_class = self.classifier.predict(features_scaled)[0]
+        Args:
+            wavelengths: Wavelength values of each spectrum
+            intensities: Intensity values of each spectrum
+            
+        Returns:
+            (predicted class, probabilities in classifier.classes_ order) per spectrum
+        """
+        spectra = [
+            (np.asarray(w, dtype=SPECTRUM_DTYPE), np.asarray(i, dtype=SPECTRUM_DTYPE))
+            for w, i in zip(wavelengths, intensities)
+        ]
+        keys = [self._spectrum_key(w, i) for w, i in spectra]
+        results = [None] * len(spectra)
+        
+        with self._prediction_cache_lock:
+            for index, key in enumerate(keys):
+                cached = self._prediction_cache.get(key)
+                if cached is not None:
+                    self._prediction_cache.move_to_end(key)
+                    results[index] = cached
+        
+        missing = [index for index, result in enumerate(results) if result is None]
+        if not missing:
+            return results
+        
+        # Featurize the uncached spectra, in one pass when they share their wavelengths
+        first_wavelengths = spectra[missing[0]][0]
+        if all(np.array_equal(spectra[index][0], first_wavelengths) for index in missing):
+            features = self.preprocess_spectra(
+                first_wavelengths, np.vstack([spectra[index][1] for index in missing])
+            )
+        else:
+            features = np.vstack([self.preprocess_spectrum(*spectra[index]) for index in missing])
+        
+        # Scale and predict the whole batch, taking each class from its probabilities
+        probabilities = self.classifier.predict_proba(self.scaler.transform(features))
+        predicted = self.classifier.classes_[probabilities.argmax(axis=1)]
+        
+        with self._prediction_cache_lock:
+            for index, predicted_class, row in zip(missing, predicted, probabilities):
+                result = (predicted_class, tuple(row))
+                results[index] = result
+                self._prediction_cache[keys[index]] = result
+            while len(self._prediction_cache) > PREDICTION_CACHE_SIZE:
+                self._prediction_cache.popitem(last=False)
+        return results
+    
+    def _build_prediction(self, predicted_class: str, probabilities: Tuple[float, ...],
+                          environmental_context: Optional[Dict]) -> Dict[str, any]:
+        """
+        Turn raw classifier output into the prediction result fields.
         
-        # Get prediction probabilities
-        probabilities = self.classifier.predict_proba(features_scaled)[0]
+        Args:
+            predicted_class: Class with the highest probability
+            probabilities: Probabilities in classifier.classes_ order
+            environmental_context: Additional context like temperature, humidity, etc.
+            
+        Returns:
+            Dictionary with material type, confidence, probabilities and reliability
+        """
         class_probabilities = dict(zip(self.classifier.classes_, probabilities))
         
         # Calculate confidence as the probability of the predicted class
@@ -292,7 +456,34 @@ class MaterialClassifier:
             'material_type': predicted_class if is_reliable else 'unknown',
             'confidence': confidence if is_reliable else 0.1,
             'all_probabilities': class_probabilities,
-            'is_reliable': is_reliable,
+            'is_reliable': is_reliable
+        }
+    
+    def predict_material(self, wavelengths: List[float], intensities: List[float], 
+                         environmental_context: Optional[Dict] = None) -> Dict[str, any]:
+        """
+        Predict material type from spectrometer data.
+        
+        Args:
+            wavelengths: List of wavelength values
+            intensities: List of corresponding intensity values
+            environmental_context: Additional context like temperature, humidity, etc.
+            
+        Returns:
+            Dictionary with prediction results
+        """
+        if not self.is_trained:
+            self.load_or_train()
+        
+        wavelengths = np.asarray(wavelengths, dtype=SPECTRUM_DTYPE)
+        intensities = np.asarray(intensities, dtype=SPECTRUM_DTYPE)
+        
+        # Make prediction and get prediction probabilities
+        predicted_class, probabilities = self.classify_spectrum(wavelengths, intensities)
+        
+        return {
+            **self._build_prediction(predicted_class, probabilities, environmental_context),
+            # Echo the spectrum as float32 arrays; orjson writes them without boxing each value
             'spectral_signature': {
                 'wavelengths': wavelengths,
                 'intensities': intensities
@@ -300,6 +491,27 @@ class MaterialClassifier:
             'environmental_context': environmental_context or {}
         }
     
+    def predict_materials(self, wavelengths: List[List[float]], intensities: List[List[float]],
+                          environmental_context: Optional[Dict] = None) -> List[Dict[str, any]]:
+        """
+        Predict material types for several spectra at once.
+        
+        Args:
+            wavelengths: Wavelength values of each spectrum
+            intensities: Intensity values of each spectrum
+            environmental_context: Context applied to every spectrum
+            
+        Returns:
+            Prediction results per spectrum, without the spectrum echo
+        """
+        if not self.is_trained:
+            self.load_or_train()
+        
+        return [
+            self._build_prediction(predicted_class, probabilities, environmental_context)
+            for predicted_class, probabilities in self.classify_spectra(wavelengths, intensities)
+        ]
+    
     def adjust_confidence_with_context(self, base_confidence: float, 
                                      environmental_context: Dict, 
                                      predicted_material: str) -> float:
@@ -357,6 +569,21 @@ def classify_material(wavelengths: List[float], intensities: List[float],
     """
     return classifier_instance.predict_material(wavelengths, intensities, environmental_context)
 
+def classify_materials(wavelengths: List[List[float]], intensities: List[List[float]],
+                       environmental_context: Optional[Dict] = None) -> List[Dict[str, any]]:
+    """
+    Classify several spectra with one pass through the classifier.
+    
+    Args:
+        wavelengths: Wavelength values of each spectrum
+        intensities: Intensity values of each spectrum
+        environmental_context: Context applied to every spectrum
+        
+    Returns:
+        List of classification results, in input order
+    """
+    return classifier_instance.predict_materials(wavelengths, intensities, environmental_context)
+
 def get_material_properties(material_type: str) -> Dict[str, any]:
     """
     Get known properties of a classified material type.
@@ -1,7 +1,69 @@
 from typing import Dict, List, Tuple
 import math
+import numpy as np
 from datetime import datetime
 
+# Sensor values averaged across readings (distance stands in for depth),
+# and the value used when no reading reports one
+READING_COLUMNS = ('temperature', 'tds', 'turbidity', 'distance', 'ph')
+READING_DEFAULTS = np.array([20.0, 500.0, 10.0, 2.0, 7.0])
+_READING_DEFAULT_VALUES = tuple(READING_DEFAULTS.tolist())
+
+# Weight of each factor's score (based on archaeological research). The scores
+# already map every factor so that 1 is best for preservation, so the weights are
+# plain positive magnitudes; the comments note which way each factor acts.
+_TEMPERATURE_WEIGHT = 0.3   # Lower temps better for preservation
+_TDS_WEIGHT = 0.25          # Lower dissolved solids better
+_TURBIDITY_WEIGHT = 0.15    # Clearer water better
+_DEPTH_WEIGHT = 0.2         # Deeper usually means more stable
+_PH_WEIGHT = 0.1            # Neutral pH is optimal
+
+def _preservation_scores(
+    temperature: float,
+    tds: float,
+    turbidity: float,
+    depth: float,
+    ph: float
+) -> Tuple[float, float, float, float, float, float]:
+    """
+    Arithmetic core of the preservation index, free of dict construction.
+    
+    Returns:
+        Tuple of the five normalized factor scores (0 = worst, 1 = best)
+        followed by their weighted sum
+    """
+    # Scores are clamped to 0-1 with conditional expressions rather than
+    # max(0, min(1, x)), which costs two builtin calls per score
+    
+    # Temperature: ideal range 0-15°C, max damage at >30°C
+    x = (30 - abs(temperature - 10)) / 20
+    temp_score = 0.0 if x < 0 else 1.0 if x > 1 else x
+    
+    # TDS: ideal < 500 ppm, significant damage >2000 ppm
+    x = (2500 - tds) / 2000
+    tds_score = 0.0 if x < 0 else 1.0 if x > 1 else x
+    
+    # Turbidity: ideal < 5 NTU, significant impact >50 NTU
+    x = (100 - turbidity) / 95
+    turbidity_score = 0.0 if x < 0 else 1.0 if x > 1 else x
+    
+    # Depth: deeper is generally better (more stable conditions), up to a point
+    x = (depth + 10) / 50
+    depth_score = 1.0 if x > 1 else x  # Up to 40m gets full score
+    
+    # pH: ideal around 7.0, effective range 6.5-8.5
+    x = (1.5 - abs(ph - 7.0)) / 1.5
+    ph_score = 0.0 if x < 0 else 1.0 if x > 1 else x
+    
+    weighted_sum = (
+        temp_score * _TEMPERATURE_WEIGHT
+        + tds_score * _TDS_WEIGHT
+        + turbidity_score * _TURBIDITY_WEIGHT
+        + depth_score * _DEPTH_WEIGHT
+        + ph_score * _PH_WEIGHT
+    )
+    return temp_score, tds_score, turbidity_score, depth_score, ph_score, weighted_sum
+
 def calculate_preservation_index(
     temperature: float,
     tds: float,
@@ -25,33 +87,9 @@ def calculate_preservation_index(
     Returns:
         Tuple of (preservation_percentage, factor_weights_used)
     """
-    
-    # Define weights for each factor (based on archaeological research)
-    # Negative weights mean higher values decrease preservation
-    # Positive weights mean higher values improve preservation
-    weights = {
-        'temperature': -0.3,    # Lower temps better for preservation
-        'tds': -0.25,           # Lower dissolved solids better
-        'turbidity': -0.15,     # Clearer water better
-        'depth': 0.2,           # Deeper usually means more stable
-        'ph': 0.1               # Neutral pH is optimal
-    }
-    
-    # Normalize values to 0-1 scale (0 = worst, 1 = best for preservation)
-    # Temperature: ideal range 0-15°C, max damage at >30°C
-    temp_score = max(0, min(1, (30 - abs(temperature - 10)) / 20))
-    
-    # TDS: ideal < 500 ppm, significant damage >2000 ppm
-    tds_score = max(0, min(1, (2500 - tds) / 2000))
-    
-    # Turbidity: ideal < 5 NTU, significant impact >50 NTU
-    turbidity_score = max(0, min(1, (100 - turbidity) / 95))
-    
-    # Depth: deeper is generally better (more stable conditions), up to a point
-    depth_score = min(1, (depth + 10) / 50)  # Up to 40m gets full score
-    
-    # pH: ideal around 7.0, effective range 6.5-8.5
-    ph_score = max(0, min(1, (1.5 - abs(ph - 7.0)) / 1.5))
+    temp_score, tds_score, turbidity_score, depth_score, ph_score, weighted_sum = _preservation_scores(
+        temperature, tds, turbidity, depth, ph
+    )
     
     normalized_scores = {
         'temperature': temp_score,
@@ -61,16 +99,87 @@ def calculate_preservation_index(
         'ph': ph_score
     }
     
-    # Calculate weighted sum
-    weighted_sum = 0
-    for factor, weight in weights.items():
-        weighted_sum += normalized_scores[factor] * abs(weight)
-    
     # Convert to percentage (0-100)
-    preservation_percentage = max(0, min(100, weighted_sum * 100))
+    percentage = weighted_sum * 100
+    preservation_percentage = 0.0 if percentage < 0 else 100.0 if percentage > 100 else percentage
     
     return preservation_percentage, normalized_scores
 
+def calculate_preservation_index_batch(
+    temperatures: np.ndarray,
+    tds: np.ndarray,
+    turbidity: np.ndarray,
+    depths: np.ndarray,
+    ph: np.ndarray
+) -> np.ndarray:
+    """
+    Calculate the preservation index for many readings at once.
+    
+    Applies the calculate_preservation_index formula element-wise, so each
+    step is one vectorized pass over all readings.
+    
+    Args:
+        temperatures: Water temperatures in Celsius
+        tds: Total dissolved solids in ppm
+        turbidity: Water turbidity in NTU
+        depths: Depths in meters
+        ph: Water pH levels
+    
+    Returns:
+        Array of preservation percentages (0-100), one per reading
+    """
+    temperatures, tds, turbidity, depths, ph = (
+        np.asarray(values, dtype=np.float64) for values in (temperatures, tds, turbidity, depths, ph)
+    )
+    
+    weighted_sum = np.clip((30 - np.abs(temperatures - 10)) / 20, 0, 1) * _TEMPERATURE_WEIGHT
+    weighted_sum += np.clip((2500 - tds) / 2000, 0, 1) * _TDS_WEIGHT
+    weighted_sum += np.clip((100 - turbidity) / 95, 0, 1) * _TURBIDITY_WEIGHT
+    weighted_sum += np.minimum(1, (depths + 10) / 50) * _DEPTH_WEIGHT
+    weighted_sum += np.clip((1.5 - np.abs(ph - 7.0)) / 1.5, 0, 1) * _PH_WEIGHT
+    
+    # Convert to percentage (0-100)
+    return np.clip(weighted_sum * 100, 0, 100)
+
+def _reading_values(sensor_readings: List[Dict]) -> Tuple[np.ndarray, List]:
+    """
+    Collect READING_COLUMNS from sensor readings into one (N, 5) array in a
+    single pass; NaN marks a value the reading did not report.
+    
+    Returns:
+        Tuple of (values, timestamps of the readings that have one)
+    """
+    values = np.full((len(sensor_readings), len(READING_COLUMNS)), np.nan)
+    timestamps = []
+    
+    for row, reading in enumerate(sensor_readings):
+        sensors = reading.get('sensors')
+        if sensors:
+            for column, key in enumerate(READING_COLUMNS):
+                if key in sensors:
+                    values[row, column] = sensors[key]
+        
+        if 'timestamp' in reading:
+            timestamps.append(reading['timestamp'])
+    
+    return values, timestamps
+
+def calculate_reading_preservation(sensor_readings: List[Dict]) -> np.ndarray:
+    """
+    Calculate the preservation index of each sensor reading on its own,
+    e.g. for time-series views.
+    
+    Args:
+        sensor_readings: List of sensor reading dictionaries
+    
+    Returns:
+        Array of preservation percentages, one per reading; values a reading
+        does not report use the same defaults as the multi-point average
+    """
+    values, _ = _reading_values(sensor_readings)
+    values = np.where(np.isnan(values), READING_DEFAULTS, values)
+    return calculate_preservation_index_batch(*values.T)
+
 def calculate_multi_point_preservation(
     sensor_readings: List[Dict]
 ) -> Dict[str, any]:
@@ -91,38 +200,29 @@ def calculate_multi_point_preservation(
             'timestamp_range': None
         }
     
-    # Extract relevant sensor values
-    temperatures = []
-    tds_values = []
-    turbidity_values = []
-    depths = []
-    ph_values = []
-    
-    timestamps = []
-    
-    for reading in sensor_readings:
-        if 'sensors' in reading:
-            sensors = reading['sensors']
-            if 'temperature' in sensors:
-                temperatures.append(sensors['temperature'])
-            if 'tds' in sensors:
-                tds_values.append(sensors['tds'])
-            if 'turbidity' in sensors:
-                turbidity_values.append(sensors['turbidity'])
-            if 'distance' in sensors:  # Assuming distance relates to depth
-                depths.append(sensors['distance'])
-            if 'ph' in sensors:  # If pH sensor is available
-                ph_values.append(sensors['ph'])
+    if len(sensor_readings) == 1:
+        # A single reading's values are the averages; no array needed
+        reading = sensor_readings[0]
+        sensors = reading.get('sensors') or {}
+        avg_temp, avg_tds, avg_turbidity, avg_depth, avg_ph = (
+            default if sensors.get(key) is None else float(sensors[key])
+            for key, default in zip(READING_COLUMNS, _READING_DEFAULT_VALUES)
+        )
+        timestamps = [reading['timestamp']] if 'timestamp' in reading else []
+    elif not any(reading.get('sensors') for reading in sensor_readings):
+        # Partial payloads without sensor values: the defaults apply as is
+        avg_temp, avg_tds, avg_turbidity, avg_depth, avg_ph = _READING_DEFAULT_VALUES
+        timestamps = [reading['timestamp'] for reading in sensor_readings if 'timestamp' in reading]
+    else:
+        # Extract relevant sensor values
+        values, timestamps = _reading_values(sensor_readings)
         
-        if 'timestamp' in reading:
-            timestamps.append(reading['timestamp'])
-    
-    # Calculate averages
-    avg_temp = sum(temperatures) / len(temperatures) if temperatures else 20.0
-    avg_tds = sum(tds_values) / len(tds_values) if tds_values else 500.0
-    avg_turbidity = sum(turbidity_values) / len(turbidity_values) if turbidity_values else 10.0
-    avg_depth = sum(depths) / len(depths) if depths else 2.0
-    avg_ph = sum(ph_values) / len(ph_values) if ph_values else 7.0
+        # Calculate averages over the reported values, falling back to defaults
+        reported = ~np.isnan(values)
+        counts = reported.sum(axis=0)
+        sums = np.where(reported, values, 0.0).sum(axis=0)
+        averages = np.where(counts > 0, sums / np.maximum(counts, 1), READING_DEFAULTS)
+        avg_temp, avg_tds, avg_turbidity, avg_depth, avg_ph = averages.tolist()
     
     # Calculate preservation index
     preservation_pct, factor_scores = calculate_preservation_index(
@@ -148,7 +248,31 @@ def calculate_multi_point_preservation(
         'timestamp_range': timestamp_range
     }
 
-def get_preservation_recommendations(preservation_percentage: float) -> List[str]:
+# Recommendations for each preservation band, shared by every call
+_RECOMMENDATIONS_EXCELLENT = (
+    "Excellent preservation conditions detected",
+    "Objects likely to maintain structural integrity",
+    "Standard monitoring protocols sufficient"
+)
+_RECOMMENDATIONS_GOOD = (
+    "Good preservation conditions",
+    "Minor degradation possible over long periods",
+    "Regular monitoring recommended"
+)
+_RECOMMENDATIONS_MODERATE = (
+    "Moderate preservation risk",
+    "Increased degradation rate possible",
+    "Enhanced protective measures advised",
+    "More frequent condition assessments needed"
+)
+_RECOMMENDATIONS_POOR = (
+    "Poor preservation conditions detected",
+    "Significant degradation risk",
+    "Immediate protective interventions required",
+    "Consider relocation to controlled environment"
+)
+
+def get_preservation_recommendations(preservation_percentage: float) -> Tuple[str, ...]:
     """
     Get recommendations based on preservation index.
     
@@ -156,27 +280,13 @@ def get_preservation_recommendations(preservation_percentage: float) -> List[str
         preservation_percentage: Calculated preservation index (0-100)
     
     Returns:
-        List of recommendations
+        Tuple of recommendations
     """
-    recommendations = []
-    
     if preservation_percentage >= 80:
-        recommendations.append("Excellent preservation conditions detected")
-        recommendations.append("Objects likely to maintain structural integrity")
-        recommendations.append("Standard monitoring protocols sufficient")
+        return _RECOMMENDATIONS_EXCELLENT
     elif preservation_percentage >= 60:
-        recommendations.append("Good preservation conditions")
-        recommendations.append("Minor degradation possible over long periods")
-        recommendations.append("Regular monitoring recommended")
+        return _RECOMMENDATIONS_GOOD
     elif preservation_percentage >= 40:
-        recommendations.append("Moderate preservation risk")
-        recommendations.append("Increased degradation rate possible")
-        recommendations.append("Enhanced protective measures advised")
-        recommendations.append("More frequent condition assessments needed")
+        return _RECOMMENDATIONS_MODERATE
     else:
-        recommendations.append("Poor preservation conditions detected")
-        recommendations.append("Significant degradation risk")
-        recommendations.append("Immediate protective interventions required")
-        recommendations.append("Consider relocation to controlled environment")
-    
-    return recommendations
\ No newline at end of file
+        return _RECOMMENDATIONS_POOR
@@ -1,16 +1,26 @@
+from collections import deque
+from dataclasses import dataclass
 from typing import Dict, Any
 import time
 
+# Most samples held for the periodic save; the oldest are dropped beyond this
+DATA_BUFFER_SIZE = 10_000
+
+@dataclass(slots=True)
+class SensorRecord:
+    timestamp: float
+    payload: Dict[str, Any]
+
 class PreservationService:
-    def __init__(self):
-        self.data_buffer = []
+    def __init__(self, buffer_size: int = DATA_BUFFER_SIZE):
+        self.data_buffer = deque(maxlen=buffer_size)
     
     def add_sensor_data(self, data: Dict[str, Any]):
-        """Add sensor data to buffer for periodic saving"""
-        self.data_buffer.append({
-            **data,
-            "timestamp": time.time()
-        })
+        """
+        Add sensor data to buffer for periodic saving.
+        The payload is kept by reference, so callers must not modify it afterwards.
+        """
+        self.data_buffer.append(SensorRecord(time.time(), data))
     
     def get_buffer_size(self) -> int:
         """Get current buffer size"""
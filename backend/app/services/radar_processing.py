@@ -45,7 +45,7 @@ class RadarProcessor:
         Returns:
             Denoised and enhanced signal
         """
-        signal_array = np.array(raw_signal)
+        signal_array = np.asarray(raw_signal)
         
         # If signal is too short, return as is
         if len(signal_array) < 3:
@@ -110,8 +110,9 @@ class RadarProcessor:
             distance=int(self.min_anomaly_separation / self.depth_resolution)  # Convert to samples
         )
         
-        # Create list of (index, amplitude) pairs
-        reflections = [(peak_idx, processed_signal[peak_idx]) for peak_idx in peaks]
+        # Create list of (index, amplitude) pairs as Python numbers, so results
+        # stay JSON-serializable whatever the dtype of the signal
+        reflections = list(zip(peaks.tolist(), processed_signal[peaks].tolist()))
         
         return reflections
     
@@ -167,7 +168,7 @@ class RadarProcessor:
         Returns:
             Dictionary with layer analysis
         """
-        profile_array = np.array(depth_profile)
+        profile_array = np.asarray(depth_profile)
         
         # Find major transitions (boundaries between layers)
         gradient = np.gradient(profile_array)
@@ -225,7 +226,7 @@ class RadarProcessor:
         Returns:
             List of detected anomalies with classifications
         """
-        if not depth_profile:
+        if len(depth_profile) == 0:
             return []
         
         # Preprocess the signal
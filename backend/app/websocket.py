@@ -1,7 +1,11 @@
 import asyncio
-import json
+import contextlib
 import logging
-from typing import Dict, List, Set
+import numpy as np
+import orjson
+import time
+from collections import deque
+from typing import Deque, Dict, Optional, Set
 from datetime import datetime
 from fastapi import WebSocket, WebSocketDisconnect
 from pydantic import BaseModel
@@ -19,11 +23,19 @@ class ConnectionManager:
     def __init__(self):
         self.active_connections: Set[WebSocket] = set()
         self.buffer_size = 100  # Maximum number of messages to buffer
-        self.message_buffer: List[dict] = []
+        self.send_timeout = 1.0  # Seconds a client may take to accept a broadcast
+        self.message_buffer: Deque[str] = deque(maxlen=self.buffer_size)  # Serialized JSON messages
         self.is_broadcasting = False
-        self.broadcast_task = None
         self.loop = None  # Store the event loop reference
         
+        # Messages waiting for the sender task; producers never wait on clients.
+        # Queued messages are all sent in order, while coalesced stream frames
+        # only keep the freshest one
+        self.outbox: Deque[str] = deque()
+        self.latest_frame: Optional[str] = None
+        self.outbox_ready: Optional[asyncio.Event] = None
+        self.sender_task: Optional[asyncio.Task] = None
+        
         # Store the event loop when it's available
         try:
             self.loop = asyncio.get_running_loop()
@@ -42,11 +54,11 @@ class ConnectionManager:
             # If no loop is running, create one or handle appropriately
             pass
             
-        logger.info(f"WebSocket client connected. Active connections: {len(self.active_connections)}")
+        logger.info("WebSocket client connected. Active connections: %d", len(self.active_connections))
 
     def disconnect(self, websocket: WebSocket):
         self.active_connections.discard(websocket)
-        logger.info(f"WebSocket client disconnected. Active connections: {len(self.active_connections)}")
+        logger.info("WebSocket client disconnected. Active connections: %d", len(self.active_connections))
 
     async def send_personal_message(self, message: str, websocket: WebSocket):
         try:
@@ -59,58 +71,106 @@ class ConnectionManager:
         disconnected_clients = set()
         successful_sends = 0
         
-        # Log connection status
-        logger.info(f"Attempting broadcast to {len(self.active_connections)} clients")
+        # Snapshot the clients once; the list serves both the sends and matching their results
+        connections = list(self.active_connections)
         
-        for connection in self.active_connections.copy():
-            try:
-                await connection.send_text(message)
+        # Log connection status; %-style arguments are only formatted when INFO is enabled
+        logger.info("Attempting broadcast to %d clients", len(connections))
+        
+        # One ASGI send event is shared by every client. It stays a text frame, which
+        # the frontend parses as JSON; the server encodes it for the wire
+        event = {"type": "websocket.send", "text": message}
+        
+        # Send to every client concurrently, so a stalled client cannot hold up the others;
+        # a client that misses the deadline is dropped
+        results = await asyncio.gather(
+            *(asyncio.wait_for(connection.send(event), self.send_timeout) for connection in connections),
+            return_exceptions=True
+        )
+        
+        for connection, result in zip(connections, results):
+            if result is None:
                 successful_sends += 1
-            except WebSocketDisconnect:
+            elif isinstance(result, WebSocketDisconnect):
                 disconnected_clients.add(connection)
-            except Exception as e:
-                logger.warning(f"Failed to send message to a client: {str(e)}")
+            elif isinstance(result, asyncio.TimeoutError):
+                logger.warning("Dropping a client that did not accept a message within %ss", self.send_timeout)
+                disconnected_clients.add(connection)
+            else:
+                logger.warning("Failed to send message to a client: %s", result)
                 disconnected_clients.add(connection)
         
-        # Clean up disconnected clients
+        # Clean up disconnected clients; stalled or failed ones are also closed, so they
+        # reconnect instead of waiting on a socket that no longer receives broadcasts
         for client in disconnected_clients:
             self.disconnect(client)
-            
-        logger.info(f"Broadcast completed: {successful_sends}/{len(self.active_connections)} clients")
-
-    def add_to_buffer(self, data: dict):
-        """Add data to buffer for potential retransmission"""
-        self.message_buffer.append(data)
-        if len(self.message_buffer) > self.buffer_size:
-            self.message_buffer.pop(0)  # Remove oldest entry
-
-    async def start_broadcasting(self):
-        """Start the broadcasting task if not already running"""
-        if not self.is_broadcasting and self.broadcast_task is None:
-            self.is_broadcasting = True
-            self.broadcast_task = asyncio.create_task(self._broadcast_loop())
-
-    async def stop_broadcasting(self):
-        """Stop the broadcasting task"""
-        if self.is_broadcasting and self.broadcast_task:
-            self.is_broadcasting = False
-            self.broadcast_task.cancel()
-            try:
-                await self.broadcast_task
-            except asyncio.CancelledError:
-                pass
-            self.broadcast_task = None
+        await asyncio.gather(*(self._close(client) for client in disconnected_clients))
+        
+        logger.info("Broadcast completed: %d/%d clients", successful_sends, len(self.active_connections))
+
+    async def _close(self, websocket: WebSocket):
+        """Close a dropped client with 1011, bounded by the send timeout"""
+        with contextlib.suppress(Exception):
+            await asyncio.wait_for(websocket.close(code=1011), self.send_timeout)
 
-    async def _broadcast_loop(self):
-        """Internal loop for handling broadcasts"""
-        while self.is_broadcasting:
-            await asyncio.sleep(0.01)  # Small delay to prevent busy waiting
+    def add_to_buffer(self, data: str):
+        """Add a serialized message to buffer for potential retransmission"""
+        self.message_buffer.append(data)  # maxlen evicts the oldest entry
+
+    def start_broadcasting(self):
+        """Mark broadcasting as running; the sensor stream runs while this is set"""
+        self.is_broadcasting = True
+
+    def stop_broadcasting(self):
+        """Mark broadcasting as stopped, ending the sensor stream after its current tick"""
+        self.is_broadcasting = False
+        if self.sender_task:
+            self.sender_task.cancel()
+            self.sender_task = None
+
+    def publish(self, message: str, coalesce: bool = False):
+        """
+        Queue a serialized message for broadcast without waiting for the clients.
+        Messages are delivered in order; with coalesce, only the freshest such
+        frame is kept, so slow clients miss intermediate stream frames instead of
+        delaying the producer. Coalesced frames never replace queued messages.
+        """
+        if self.sender_task is None or self.sender_task.done():
+            self.outbox_ready = asyncio.Event()
+            self.sender_task = asyncio.create_task(self._send_loop(self.outbox_ready))
+        
+        if coalesce:
+            self.latest_frame = message  # Replaces a stale frame that was not sent yet
+        else:
+            self.outbox.append(message)
+        self.outbox_ready.set()
+
+    async def _send_loop(self, ready: asyncio.Event):
+        while True:
+            await ready.wait()
+            ready.clear()
+            # Queued messages first, then the freshest frame
+            while self.outbox:
+                await self._send_queued(self.outbox.popleft())
+            frame, self.latest_frame = self.latest_frame, None
+            if frame is not None:
+                await self._send_queued(frame)
+
+    async def _send_queued(self, message: str):
+        try:
+            await self.send_message(message)
+        except Exception as e:
+            logger.warning("Failed to broadcast a queued message: %s", e)
 
     async def send_sensor_data(self, data: SensorData):
         """Send sensor data to all connected clients"""
-        json_data = data.dict() if hasattr(data, 'dict') else data.model_dump()
-        await self.broadcast(json.dumps(json_data))
-        self.add_to_buffer(json_data)
+        # Serialize once with pydantic-core; the same string is sent to every client and buffered
+        await self.send_message(data.model_dump_json())
+    
+    async def send_message(self, message: str):
+        """Send an already serialized message to all connected clients and buffer it"""
+        await self.broadcast(message)
+        self.add_to_buffer(message)
     
     def send_sensor_data_from_thread(self, data: SensorData):
         """Send sensor data from a thread context"""
@@ -122,21 +182,83 @@ class ConnectionManager:
                 logger.error("No event loop available to send sensor data from thread")
                 return
         
-        import json
-        json_data = data.dict() if hasattr(data, 'dict') else data.model_dump()
-        message = json.dumps(json_data)
+        message = data.model_dump_json()
         
         # Use run_coroutine_threadsafe to send from thread
         future = asyncio.run_coroutine_threadsafe(self.broadcast(message), self.loop)
         try:
             # Wait for the broadcast to complete
             result = future.result(timeout=1.0)
-            logger.info(f"Successfully sent sensor data from thread")
+            logger.info("Successfully sent sensor data from thread")
         except Exception as e:
-            logger.error(f"Failed to send sensor data from thread: {e}")
+            logger.error("Failed to send sensor data from thread: %s", e)
 
 manager = ConnectionManager()
 
+class PushChannel:
+    """
+    Push JSON events to subscribed WebSocket clients so they don't have to poll.
+    Each client gets its own bounded queue, so one slow consumer never blocks the others.
+    """
+    def __init__(self, queue_size: int = 10):
+        self.queue_size = queue_size
+        self.subscribers: Dict[WebSocket, asyncio.Queue] = {}
+        self.loop = None
+
+    async def serve(self, websocket: WebSocket):
+        """Accept a client and keep it subscribed until it disconnects"""
+        await websocket.accept()
+        self.loop = asyncio.get_running_loop()
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self.subscribers[websocket] = queue
+        sender = asyncio.create_task(self._send_loop(websocket, queue))
+        
+        try:
+            while True:
+                # Incoming messages are ignored; receiving just detects disconnects
+                await websocket.receive_text()
+        except WebSocketDisconnect:
+            pass
+        finally:
+            self.subscribers.pop(websocket, None)
+            sender.cancel()
+
+    async def _send_loop(self, websocket: WebSocket, queue: asyncio.Queue):
+        while True:
+            message = await queue.get()
+            try:
+                await websocket.send_text(message)
+            except Exception as e:
+                logger.warning("Failed to push message to a client: %s", e)
+                return
+
+    def _enqueue(self, message: str):
+        for queue in self.subscribers.values():
+            if queue.full():
+                queue.get_nowait()  # Drop the oldest event for slow consumers
+            queue.put_nowait(message)
+
+    def publish(self, event: dict):
+        """Publish an event from either the event loop or a threadpool endpoint"""
+        if not self.subscribers or self.loop is None:
+            return
+        
+        # Serialized once per event in Rust; text frames, since clients JSON.parse the data
+        message = orjson.dumps(event, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+        
+        if running_loop is self.loop:
+            self._enqueue(message)
+        else:
+            self.loop.call_soon_threadsafe(self._enqueue, message)
+
+# Push channels replacing HTTP polling of /camera/latest and /control/device-status
+camera_channel = PushChannel()
+device_status_channel = PushChannel()
+
 # Predefined sample data for demonstration
 sample_sensor_data = {
     "timestamp": int(datetime.now().timestamp() * 1000),
@@ -167,45 +289,73 @@ sample_sensor_data = {
     }
 }
 
+# Random source for the simulated sensor jitter
+_rng = np.random.default_rng()
+
+# Simulated spectrometer wavelengths: 0, 10, 20, ..., 750 (76 values)
+_BASE_WAVELENGTHS = list(range(0, 751, 10))
+sample_sensor_data["spectrometer"]["wavelengths"] = _BASE_WAVELENGTHS
+
+# Bounds for all of a tick's random values, drawn in one call: 6 motion jitters,
+# then a base intensity and an intensity jitter per wavelength
+_MOTION_JITTER = 6
+_DRAW_LOW = np.concatenate((
+    np.full(_MOTION_JITTER, -0.01), np.full(len(_BASE_WAVELENGTHS), 0.1), np.full(len(_BASE_WAVELENGTHS), -0.01)
+))
+_DRAW_HIGH = np.concatenate((
+    np.full(_MOTION_JITTER, 0.01), np.full(len(_BASE_WAVELENGTHS), 1.0), np.full(len(_BASE_WAVELENGTHS), 0.01)
+))
+
+# The simulated motion vectors live as float32 arrays, updated in place each tick
+# and serialized directly by orjson
+for _vector in ("accelerometer", "magnetometer"):
+    sample_sensor_data["sensors"][_vector] = np.array(sample_sensor_data["sensors"][_vector], dtype=np.float32)
+
+# The simulated radar and camera data never change, so their JSON is built once
+# and closes every message, in SensorData field order
+_STATIC_SUFFIX = (
+    ',"radar":' + orjson.dumps(sample_sensor_data["radar"]).decode()
+    + ',"camera":' + orjson.dumps(sample_sensor_data["camera"]).decode() + '}'
+)
+
 async def simulate_sensor_stream():
     """Simulate continuous sensor data streaming"""
     while manager.is_broadcasting:
-        # Update timestamp
-        sample_sensor_data["timestamp"] = int(datetime.now().timestamp() * 1000)
+        # Update timestamp, reading the clock once per tick without building a datetime;
+        # the second within the minute is the same in local time for whole-minute offsets
+        now = time.time()
+        sample_sensor_data["timestamp"] = int(now * 1000)
         
         # Slightly vary some sensor values to simulate real data
-        sample_sensor_data["sensors"]["temperature"] += (0.1 - 0.2 * (datetime.now().second % 10) / 10)
-        sample_sensor_data["sensors"]["humidity"] += (0.2 - 0.4 * (datetime.now().second % 10) / 10)
+        phase = (int(now) % 10) / 10
+        sample_sensor_data["sensors"]["temperature"] += (0.1 - 0.2 * phase)
+        sample_sensor_data["sensors"]["humidity"] += (0.2 - 0.4 * phase)
         sample_sensor_data["sensors"]["battery"] -= 0.001  # Simulate slight battery drain
         
-        # Add subtle, varying accelerometer values within -20 to +20 range
-        import random
-        ax = max(-20, min(20, sample_sensor_data["sensors"]["accelerometer"][0] + random.uniform(-0.01, 0.01)))
-        ay = max(-20, min(20, sample_sensor_data["sensors"]["accelerometer"][1] + random.uniform(-0.01, 0.01)))
-        az = max(-20, min(20, sample_sensor_data["sensors"]["accelerometer"][2] + random.uniform(-0.01, 0.01)))
-        sample_sensor_data["sensors"]["accelerometer"] = [ax, ay, az]
+        draws = _rng.uniform(_DRAW_LOW, _DRAW_HIGH)
         
-        # Add subtle, varying magnetometer values within -20 to +20 range
-        mx = max(-20, min(20, sample_sensor_data["sensors"]["magnetometer"][0] + random.uniform(-0.01, 0.01)))
-        my = max(-20, min(20, sample_sensor_data["sensors"]["magnetometer"][1] + random.uniform(-0.01, 0.01)))
-        mz = max(-20, min(20, sample_sensor_data["sensors"]["magnetometer"][2] + random.uniform(-0.01, 0.01)))
-        sample_sensor_data["sensors"]["magnetometer"] = [mx, my, mz]
+        # Add subtle, varying accelerometer and magnetometer values within -20 to +20 range
+        jitter = draws[:_MOTION_JITTER].reshape(2, 3).astype(np.float32)
+        for vector, vector_jitter in zip(("accelerometer", "magnetometer"), jitter):
+            values = sample_sensor_data["sensors"][vector]
+            values += vector_jitter
+            np.clip(values, -20, 20, out=values)
         
         # Add subtle, varying spectrometer intensity values
-        # Change wavelengths to be from 0 to 750 range as requested
-        base_wavelengths = list(range(0, 751, 10))  # 0, 10, 20, ..., 750 (76 values)
-        base_intensity = [random.uniform(0.1, 1.0) for _ in base_wavelengths]  # Random intensities between 0.1 and 1.0
-        # Apply small random variations to intensity values
-        varied_intensity = []
-        for i, val in enumerate(base_intensity):
-            variation = random.uniform(-0.01, 0.01)  # Very small variation
-            new_val = max(0.0, min(1.0, val + variation))  # Clamp between 0 and 1
-            varied_intensity.append(new_val)
-        sample_sensor_data["spectrometer"]["wavelengths"] = base_wavelengths
-        sample_sensor_data["spectrometer"]["intensity"] = varied_intensity
+        # Random intensities between 0.1 and 1.0 with a very small variation, clamped to 0-1
+        base_intensity, intensity_jitter = np.split(draws[_MOTION_JITTER:], 2)
+        base_intensity += intensity_jitter
+        sample_sensor_data["spectrometer"]["intensity"] = np.clip(base_intensity, 0.0, 1.0).tolist()
         
         if sample_sensor_data["sensors"]["battery"] < 20:
             sample_sensor_data["sensors"]["battery"] = 100  # Reset battery simulation
             
-        await manager.send_sensor_data(SensorData(**sample_sensor_data))
+        # Serialize only the changing fields and append the static tail, instead of
+        # validating and serializing a whole SensorData every tick
+        dynamic = orjson.dumps({
+            "timestamp": sample_sensor_data["timestamp"],
+            "sensors": sample_sensor_data["sensors"],
+            "spectrometer": sample_sensor_data["spectrometer"]
+        }, option=orjson.OPT_SERIALIZE_NUMPY)
+        manager.publish(dynamic[:-1].decode() + _STATIC_SUFFIX, coalesce=True)
         await asyncio.sleep(0.1)  # Send data at ~10Hz rate
\ No newline at end of file
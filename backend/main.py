@@ -1,5 +1,6 @@
-from fastapi import FastAPI, WebSocket
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 import uvicorn
 import asyncio
 import os
@@ -11,13 +12,14 @@ from datetime import datetime, timedelta
 from app.routers import sensors, materials, radar, camera, system, control, settings
 from app.routers.preservation import router as preservation_router
 from app.routers.advanced_features import router as advanced_features_router
-from app.routers.api_config import router as api_config_router
+from app.routers.api_config import router as api_config_router, close_ping_client
 from app.routers.ai_analysis import router as ai_analysis_router
 from app.routers.artifacts import router as artifacts_router
 from app.routers.esp32_data import router as esp32_data_router
 from app.websocket import manager, simulate_sensor_stream
 from app.services.notifications_service import notifications_service
-from app.db import init_db
+from app.services.material_classification import classifier_instance
+from app.db import init_db, async_engine
 
 def start_periodic_data_save():
     """Background task to periodically save sensor data to database every 5 minutes"""
@@ -48,13 +50,24 @@ async def lifespan(app: FastAPI):
     # Start the periodic data saving task
     start_periodic_data_save()
     
+    # Start the batched camera upload writer
+    camera.start_camera_ingest()
+    
+    # Have the material classifier ready before the first request
+    await asyncio.to_thread(classifier_instance.load_or_train)
+    
     yield
+    
+    await camera.stop_camera_ingest()
+    await close_ping_client()
+    await async_engine.dispose()
 
 app = FastAPI(
     title="ArchaeoScan Backend API",
     description="Real-time archaeological monitoring platform backend",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # Add CORS middleware
@@ -107,7 +120,7 @@ async def websocket_endpoint(websocket: WebSocket):
         notifications_service.remove_websocket(websocket)
         # If no more connections, stop the simulation
         if len(manager.active_connections) == 0 and manager.is_broadcasting:
-            await manager.stop_broadcasting()
+            manager.stop_broadcasting()
 
 if __name__ == "__main__":
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
@@ -1,6 +1,6 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text, JSON
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text, JSON, Index
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, synonym
 from models import Base
 from enum import Enum
 
@@ -20,7 +20,7 @@ class SensorData(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     artifact_id = Column(Integer, ForeignKey("artifacts.id"))  # Link to specific artifact
-    timestamp = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    timestamp = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
     esp32_id = Column(String(50), nullable=False)  # ID of the ESP32 device
     
     # Environmental sensor data
@@ -61,16 +61,32 @@ class Artifacts(Base):
     
     # Discovery and preservation data
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    discovered_at = synonym("created_at")  # Name used by the catalog API
     preservation = Column(Float)  # Final preservation percentage
     
     # Foreign keys
     sensor_data_id = Column(Integer, ForeignKey("sensor_data.id"))  # Link to sensor data at discovery
+    sensor_data_record = relationship("SensorData", foreign_keys=[sensor_data_id])
     
     # Media references
     images = Column(JSON)  # JSON array of image URLs/paths
     radar_image = Column(String(500))  # Path to radar image
     video_url = Column(String(500))  # URL/path to related video
     
+    __table_args__ = (
+        # Radius searches filter on a latitude/longitude bounding box first
+        Index("ix_artifacts_lat_lng", "latitude", "longitude"),
+        # Material statistics group by material; catalog filters also range over
+        # preservation and discovery date
+        Index("ix_artifacts_material", "material"),
+        Index("ix_artifacts_preservation", "preservation"),
+        Index("ix_artifacts_created_at", "created_at"),
+        # On Postgres, a trigram index lets the catalog's substring ILIKE on material use an index
+        Index(
+            "ix_artifacts_material_trgm", "material",
+            postgresql_using="gin", postgresql_ops={"material": "gin_trgm_ops"}
+        ).ddl_if(dialect="postgresql"),
+    )
 
 
 class RadarImages(Base):
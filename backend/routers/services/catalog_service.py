@@ -1,8 +1,51 @@
-from typing import List, Dict, Any, Optional
-from sqlalchemy.orm import Session
+from typing import List, Dict, Any, Optional, Callable, Hashable, Iterable, Iterator
+from collections import OrderedDict
+import math
+import time
+from operator import attrgetter
+from sqlalchemy import func
+from sqlalchemy.orm import Session, selectinload, raiseload
 from datetime import datetime, timedelta
 from models.database_models import Artifacts, SensorData
-from .database_service import DatabaseService
+
+# Approximate km per degree of latitude
+KM_PER_DEGREE = 111.0
+
+# Artifact and linked sensor attributes read for each catalog entry
+_ARTIFACT_FIELDS = attrgetter(
+    "id", "name", "material", "latitude", "longitude", "depth",
+    "discovered_at", "preservation", "sensor_data_id", "images", "video_url"
+)
+_SENSOR_FIELD_NAMES = ("temperature", "turbidity", "tds", "water_preservation", "final_preservation")
+_SENSOR_FIELDS = attrgetter(*_SENSOR_FIELD_NAMES)
+
+# Rows fetched per round trip when streaming catalog results
+STREAM_BATCH_SIZE = 500
+
+# How far back preservation trends look
+TRENDS_WINDOW_DAYS = 30
+
+# Statistics, trends and filtered pages are served from this process's copy for up to
+# STATS_CACHE_TTL / FILTER_CACHE_TTL seconds; adding an artifact drops them immediately
+STATS_CACHE_TTL = 60.0
+FILTER_CACHE_TTL = 30.0
+CATALOG_CACHE_SIZE = 64  # Most recently used results kept, mostly distinct filter queries
+_catalog_cache: "OrderedDict[Hashable, tuple]" = OrderedDict()  # key -> (monotonic compute time, result)
+
+def _cached(key: Hashable, compute: Callable[[], Any], ttl: float = STATS_CACHE_TTL) -> Any:
+    """Return the cached result for key, recomputing it once it is older than ttl"""
+    entry = _catalog_cache.get(key)
+    if entry is None or time.monotonic() - entry[0] >= ttl:
+        entry = (time.monotonic(), compute())
+        _catalog_cache[key] = entry
+        while len(_catalog_cache) > CATALOG_CACHE_SIZE:
+            _catalog_cache.popitem(last=False)
+    _catalog_cache.move_to_end(key)
+    return entry[1]
+
+def invalidate_catalog_cache():
+    """Drop all cached catalog results, e.g. after an artifact is added"""
+    _catalog_cache.clear()
 
 class CatalogService:
     """
@@ -11,7 +54,6 @@ class CatalogService:
     
     def __init__(self, db: Session):
         self.db = db
-        self.db_service = DatabaseService(db)
     
     def get_artifacts_filtered(
         self,
@@ -29,133 +71,169 @@ class CatalogService:
         """
         Get artifacts with various filters
         """
-        query = self.db.query(Artifacts)
+        def compute():
+            query = self._filtered_query(
+                material=material,
+                preservation_min=preservation_min,
+                preservation_max=preservation_max,
+                date_from=date_from,
+                date_to=date_to,
+                latitude=latitude,
+                longitude=longitude,
+                radius_km=radius_km
+            )
+            
+            # Apply limit and offset to database query
+            artifacts = query.offset(offset).limit(limit).all()
+            return self._format_artifacts(artifacts)
+        
+        key = (
+            "artifacts_filtered", material, preservation_min, preservation_max,
+            date_from, date_to, latitude, longitude, radius_km, limit, offset
+        )
+        return _cached(key, compute, FILTER_CACHE_TTL)
+    
+    def iter_artifacts_filtered(
+        self,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        **filters
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Yield formatted artifacts matching the get_artifacts_filtered filters,
+        fetching rows STREAM_BATCH_SIZE at a time so memory stays bounded
+        """
+        query = self._filtered_query(**filters).offset(offset)
+        if limit is not None:
+            query = query.limit(limit)
+        yield from self._iter_formatted(query.yield_per(STREAM_BATCH_SIZE))
+    
+    def count_artifacts_filtered(self, **filters) -> int:
+        """
+        Count all artifacts matching the get_artifacts_filtered filters, ignoring paging
+        """
+        def compute():
+            return self.db.query(func.count(Artifacts.id)).filter(
+                *self._filter_conditions(**filters)
+            ).scalar()
+        
+        key = ("artifacts_filtered_count",) + tuple(sorted(filters.items()))
+        return _cached(key, compute, FILTER_CACHE_TTL)
+    
+    def _filtered_query(self, **filters):
+        """
+        Build the artifact query for the catalog filters, without paging
+        """
+        # Load sensor records in one extra query; any other lazy load raises
+        return self.db.query(Artifacts).options(
+            selectinload(Artifacts.sensor_data_record),
+            raiseload("*")
+        ).filter(*self._filter_conditions(**filters))
+    
+    def _filter_conditions(
+        self,
+        material: Optional[str] = None,
+        preservation_min: Optional[float] = None,
+        preservation_max: Optional[float] = None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        latitude: Optional[float] = None,
+        longitude: Optional[float] = None,
+        radius_km: Optional[float] = None
+    ):
+        """
+        WHERE conditions for the catalog filters, shared by the page and count queries
+        """
+        conditions = []
         
-        # Apply filters
         if material:
-            query = query.filter(Artifacts.material.ilike(f"%{material}%"))
+            conditions.append(Artifacts.material.ilike(f"%{material}%"))
         
         if preservation_min is not None:
-            query = query.filter(Artifacts.preservation >= preservation_min)
+            conditions.append(Artifacts.preservation >= preservation_min)
         
         if preservation_max is not None:
-            query = query.filter(Artifacts.preservation <= preservation_max)
+            conditions.append(Artifacts.preservation <= preservation_max)
         
         if date_from:
-            query = query.filter(Artifacts.discovered_at >= date_from)
+            conditions.append(Artifacts.discovered_at >= date_from)
         
         if date_to:
-            query = query.filter(Artifacts.discovered_at <= date_to)
+            conditions.append(Artifacts.discovered_at <= date_to)
         
         # Apply location filter if provided
         if latitude is not None and longitude is not None and radius_km is not None:
-            # Simple location filtering (in production, use proper geospatial queries)
-            # For now, we'll just filter by a simple proximity check
-            all_artifacts = query.all()
-            filtered_artifacts = []
-            
-            for artifact in all_artifacts:
-                if artifact.latitude and artifact.longitude:
-                    # Simple distance approximation (not accurate for large distances)
-                    lat_diff = abs(artifact.latitude - latitude)
-                    lon_diff = abs(artifact.longitude - longitude)
-                    
-                    # Approximate km per degree: 111km per degree of latitude
-                    approx_distance = ((lat_diff * 111) ** 2 + (lon_diff * 111) ** 2) ** 0.5
-                    
-                    if approx_distance <= radius_km:
-                        filtered_artifacts.append(artifact)
+            # Equirectangular distance: degrees of longitude shrink with cos(latitude)
+            km_per_degree_lon = KM_PER_DEGREE * max(math.cos(math.radians(latitude)), 1e-6)
+            lat_span = radius_km / KM_PER_DEGREE
+            lon_span = radius_km / km_per_degree_lon
             
-            # Apply limit and offset manually since we're filtering in memory
-            start_idx = offset
-            end_idx = start_idx + limit
-            filtered_results = filtered_artifacts[start_idx:end_idx]
-            
-            return self._format_artifacts(filtered_results)
-        else:
-            # Apply limit and offset to database query
-            artifacts = query.offset(offset).limit(limit).all()
-            return self._format_artifacts(artifacts)
+            # Bounding box first, as range predicates the (latitude, longitude) index can serve,
+            # then the exact radius; both run in the database so offset/limit apply there
+            lat_km = (Artifacts.latitude - latitude) * KM_PER_DEGREE
+            lon_km = (Artifacts.longitude - longitude) * km_per_degree_lon
+            conditions.extend((
+                Artifacts.latitude.between(latitude - lat_span, latitude + lat_span),
+                Artifacts.longitude.between(longitude - lon_span, longitude + lon_span),
+                lat_km * lat_km + lon_km * lon_km <= radius_km * radius_km
+            ))
+        
+        return conditions
     
     def _format_artifacts(self, artifacts: List[Artifacts]) -> List[Dict[str, Any]]:
         """
         Format artifacts for API response
         """
-        result = []
+        return list(self._iter_formatted(artifacts))
+    
+    def _iter_formatted(self, artifacts: Iterable[Artifacts]) -> Iterator[Dict[str, Any]]:
+        """
+        Format artifacts for API response one at a time
+        """
         for artifact in artifacts:
+            (artifact_id, name, material, latitude, longitude, depth,
+             discovered_at, preservation, sensor_data_id, images, video_url) = _ARTIFACT_FIELDS(artifact)
             artifact_dict = {
-                "id": artifact.id,
-                "name": artifact.name,
-                "material": artifact.material,
+                "id": artifact_id,
+                "name": name,
+                "material": material,
                 "location": {
-                    "latitude": artifact.latitude,
-                    "longitude": artifact.longitude,
-                    "depth": artifact.depth
+                    "latitude": latitude,
+                    "longitude": longitude,
+                    "depth": depth
                 },
-                "discovered_at": artifact.discovered_at.isoformat() if artifact.discovered_at else None,
-                "preservation": artifact.preservation,
-                "sensor_data_id": artifact.sensor_data_id,
-                "images": artifact.images or [],
-                "video_url": artifact.video_url
+                "discovered_at": discovered_at.isoformat() if discovered_at else None,
+                "preservation": preservation,
+                "sensor_data_id": sensor_data_id,
+                "images": images or [],
+                "video_url": video_url
             }
             
-            # Add sensor data if available
-            if artifact.sensor_data_record:
-                # Handle case where sensor_data might be a list
-                sensor_data_item = artifact.sensor_data_record[0] if isinstance(artifact.sensor_data_record, list) else artifact.sensor_data_record
-                artifact_dict["sensor_data"] = {
-                    "temperature": sensor_data_item.temperature,
-                    "turbidity": sensor_data_item.turbidity,
-                    "tds": sensor_data_item.tds,
-                    "water_preservation": sensor_data_item.water_preservation,
-                    "final_preservation": sensor_data_item.final_preservation
-                }
-            elif artifact.sensor_data_id:
-                # If we have sensor_data_id but no joined data, fetch it separately
-                sensor_record = self.db.query(SensorData).filter(SensorData.id == artifact.sensor_data_id).first()
-                if sensor_record:
-                    artifact_dict["sensor_data"] = {
-                        "temperature": sensor_record.temperature,
-                        "turbidity": sensor_record.turbidity,
-                        "tds": sensor_record.tds,
-                        "water_preservation": sensor_record.water_preservation,
-                        "final_preservation": sensor_record.final_preservation
-                    }
+            # Add sensor data if available (eager-loaded by the caller)
+            sensor_record = artifact.sensor_data_record
+            if sensor_record:
+                artifact_dict["sensor_data"] = dict(zip(_SENSOR_FIELD_NAMES, _SENSOR_FIELDS(sensor_record)))
             
-            result.append(artifact_dict)
-        
-        return result
+            yield artifact_dict
     
     def get_material_statistics(self) -> Dict[str, Any]:
         """
         Get statistics about different materials
         """
-        artifacts = self.db.query(Artifacts).all()
-        
-        material_counts = {}
-        preservation_by_material = {}
-        total_artifacts = len(artifacts)
-        
-        for artifact in artifacts:
-            material = artifact.material or "unknown"
-            preservation = artifact.preservation or 0
-            
-            # Count materials
-            if material in material_counts:
-                material_counts[material] += 1
-            else:
-                material_counts[material] = 1
-            
-            # Track preservation by material
-            if material in preservation_by_material:
-                preservation_by_material[material].append(preservation)
-            else:
-                preservation_by_material[material] = [preservation]
+        return _cached("material_statistics", self._compute_material_statistics)
+    
+    def _compute_material_statistics(self) -> Dict[str, Any]:
+        # Aggregate per material in the database; only one row per material comes back
+        material = func.coalesce(func.nullif(Artifacts.material, ""), "unknown")
+        rows = self.db.query(
+            material,
+            func.count(Artifacts.id),
+            func.avg(func.coalesce(Artifacts.preservation, 0))
+        ).group_by(material).all()
         
-        # Calculate average preservation by material
-        avg_preservation_by_material = {}
-        for material, pres_list in preservation_by_material.items():
-            avg_preservation_by_material[material] = sum(pres_list) / len(pres_list) if pres_list else 0
+        material_counts = {name: count for name, count, _ in rows}
+        avg_preservation_by_material = {name: float(avg or 0) for name, _, avg in rows}
+        total_artifacts = sum(material_counts.values())
         
         return {
             "total_artifacts": total_artifacts,
@@ -172,46 +250,34 @@ class CatalogService:
         """
         Get trends in preservation over time
         """
-        # Get recent sensor data
-        recent_data = self.db_service.get_recent_sensor_data(limit=100)
+        # Sensor data arrives continuously, so trends rely on the TTL alone
+        return _cached("preservation_trends", self._compute_preservation_trends)
+    
+    def _compute_preservation_trends(self) -> Dict[str, Any]:
+        # Daily averages over the last TRENDS_WINDOW_DAYS, grouped in the database
+        day = func.date(SensorData.timestamp)
+        rows = self.db.query(
+            day,
+            func.avg(SensorData.water_preservation),
+            func.avg(SensorData.final_preservation),
+            func.count(SensorData.id)
+        ).filter(
+            SensorData.timestamp >= datetime.utcnow() - timedelta(days=TRENDS_WINDOW_DAYS)
+        ).group_by(day).order_by(day.desc()).all()
         
-        if not recent_data:
+        if not rows:
             return {}
         
-        # Group by date and calculate averages
-        daily_stats = {}
-        for record in recent_data:
-            if not record.timestamp:
-                continue
-                
-            date_key = record.timestamp.date().isoformat()
-            if date_key not in daily_stats:
-                daily_stats[date_key] = {
-                    "water_preservation": [],
-                    "final_preservation": [],
-                    "count": 0
-                }
-            
-            if record.water_preservation is not None:
-                daily_stats[date_key]["water_preservation"].append(record.water_preservation)
-            
-            if record.final_preservation is not None:
-                daily_stats[date_key]["final_preservation"].append(record.final_preservation)
-                
-            daily_stats[date_key]["count"] += 1
-        
-        # Calculate daily averages
-        result = []
-        for date_key, stats in daily_stats.items():
-            result.append({
-                "date": date_key,
-                "avg_water_preservation": sum(stats["water_preservation"]) / len(stats["water_preservation"]) if stats["water_preservation"] else 0,
-                "avg_final_preservation": sum(stats["final_preservation"]) / len(stats["final_preservation"]) if stats["final_preservation"] else 0,
-                "sample_count": stats["count"]
-            })
-        
-        # Sort by date
-        result.sort(key=lambda x: x["date"], reverse=True)
+        # SQLite returns the day as a string, other backends as a date
+        result = [
+            {
+                "date": date_key if isinstance(date_key, str) else date_key.isoformat(),
+                "avg_water_preservation": float(avg_water or 0),
+                "avg_final_preservation": float(avg_final or 0),
+                "sample_count": count
+            }
+            for date_key, avg_water, avg_final, count in rows
+        ]
         
         return {
             "daily_trends": result,
@@ -1,3 +1,4 @@
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 from typing import List, Optional
@@ -90,6 +91,10 @@ class DatabaseService:
         """Get a specific sensor data record"""
         return self.db.query(SensorData).filter(SensorData.id == sensor_id).first()
 
+    def get_sensor_data_watermark(self) -> int:
+        """Highest sensor data id, which changes whenever any process stores a record"""
+        return self.db.query(func.max(SensorData.id)).scalar() or 0
+
     def get_recent_sensor_data(self, limit: int = 100) -> List[SensorData]:
         """Get recent sensor data records"""
         return self.db.query(SensorData).order_by(SensorData.timestamp.desc()).limit(limit).all()
@@ -126,6 +131,9 @@ class DatabaseService:
             self.db.commit()
             self.db.refresh(artifact)
             
+            from .catalog_service import invalidate_catalog_cache
+            invalidate_catalog_cache()
+            
             # Send notification for new artifact
             import asyncio
             artifact_notification = notifications_service.create_new_artifact_notification({
@@ -242,12 +250,9 @@ class DatabaseService:
             self.db.rollback()
             raise
 
-# Global service instance
+# Global service instance placeholder (will be instantiated per request)
 db_service = None
 
 def get_db_service(db: Session) -> DatabaseService:
-    """Get database service instance"""
-    global db_service
-    if db_service is None:
-        db_service = DatabaseService(db)
-    return db_service
\ No newline at end of file
+    """Get database service instance bound to the request's session"""
+    return DatabaseService(db)
\ No newline at end of file
@@ -1,6 +1,7 @@
-from typing import Dict, Any
+from typing import Dict, Any, Tuple
 from dataclasses import dataclass
 import math
+import numpy as np
 import asyncio
 from datetime import datetime, timedelta
 
@@ -14,6 +15,34 @@ class SensorData:
     humidity: float = 0.0  # %
     distance: float = 0.0  # cm
 
+# Per-material columns of the table passed to material_preservations, in row order
+MATERIAL_TABLE_FIELDS = (
+    'base_survival',
+    'turbidity_threshold', 'turbidity_penalty',
+    'temperature_threshold', 'temperature_penalty',
+    'tds_threshold', 'tds_penalty'
+)
+
+def material_preservations(turbidity: float, temperature: float, tds: float, table: np.ndarray) -> np.ndarray:
+    """
+    Preservation percentage of every material at once.
+    
+    Args:
+        turbidity, temperature, tds: Sanitized sensor readings
+        table: One row per MATERIAL_TABLE_FIELDS entry, one column per material
+        
+    Returns:
+        Preservation percentages (0-100), in table column order
+    """
+    base, turbidity_threshold, turbidity_penalty, temperature_threshold, temperature_penalty, \
+        tds_threshold, tds_penalty = table
+    # Each penalty applies where the reading exceeds that material's threshold
+    preservation = base - turbidity_penalty * (turbidity > turbidity_threshold)
+    preservation -= temperature_penalty * (temperature > temperature_threshold)
+    preservation -= tds_penalty * (tds > tds_threshold)
+    np.clip(preservation, 0.0, 100.0, out=preservation)
+    return np.round(preservation, 2, out=preservation)
+
 class PreservationService:
     """Service for calculating preservation indices based on sensor data"""
     
@@ -321,6 +350,36 @@ class PreservationService:
                 'tds_penalty': 0
             }
         }
+        
+        # Columnar copy of the database for scoring all materials in one pass
+        self._material_keys = tuple(self.material_database)
+        self._material_table = np.array(
+            [[props[field] for props in self.material_database.values()] for field in MATERIAL_TABLE_FIELDS],
+            dtype=np.float64
+        )
+
+    def _sanitized_readings(self, sensor_data: SensorData) -> Tuple[float, float, float]:
+        """Turbidity, temperature and TDS with missing or invalid values replaced by defaults"""
+        turbidity = getattr(sensor_data, 'turbidity', 0) or 0
+        temperature = getattr(sensor_data, 'temperature', 0) or 0
+        tds = getattr(sensor_data, 'tds', 0) or 0
+        if math.isnan(turbidity) or math.isinf(turbidity):
+            turbidity = 0
+        if math.isnan(temperature) or math.isinf(temperature):
+            temperature = 20  # Default temperature
+        if math.isnan(tds) or math.isinf(tds):
+            tds = 0
+        return turbidity, temperature, tds
+
+    def calculate_material_scores(self, sensor_data: SensorData) -> Tuple[Tuple[str, ...], np.ndarray]:
+        """
+        Preservation of every material in database order, scored in one vectorized pass
+
+        Returns:
+            Material names and the matching array of preservation percentages
+        """
+        scores = material_preservations(*self._sanitized_readings(sensor_data), self._material_table)
+        return self._material_keys, scores
 
     def calculate_material_preservation(self, material: str, sensor_data: SensorData) -> float:
         """
@@ -341,18 +400,7 @@ class PreservationService:
         base_preservation = material_props['base_survival']
         
         # Validate sensor data values to prevent NaN
-        turbidity = getattr(sensor_data, 'turbidity', 0) or 0
-        temperature = getattr(sensor_data, 'temperature', 0) or 0
-        tds = getattr(sensor_data, 'tds', 0) or 0
-        
-        # Check for invalid values (NaN, infinity)
-        import math
-        if math.isnan(turbidity) or math.isinf(turbidity):
-            turbidity = 0
-        if math.isnan(temperature) or math.isinf(temperature):
-            temperature = 20  # Default temperature
-        if math.isnan(tds) or math.isinf(tds):
-            tds = 0
+        turbidity, temperature, tds = self._sanitized_readings(sensor_data)
         
         # Apply corrections based on sensor values exceeding thresholds
         # This implements the exact algorithm you specified
@@ -426,17 +474,11 @@ class PreservationService:
         Returns:
             Dictionary containing preservation data for all materials and water
         """
-        materials = {}
-        material_preservations = []
-        
-        # Calculate preservation for all 30 materials
-        for material_key, material_props in self.material_database.items():
-            preservation = self.calculate_material_preservation(material_key, sensor_data)
-            # Ensure preservation is a valid number, not NaN
-            if math.isnan(preservation) or math.isinf(preservation):
-                preservation = 100.0
-            materials[material_key] = preservation
-            material_preservations.append(preservation)
+        # Calculate preservation for all 30 materials in one vectorized pass;
+        # sanitized readings keep every value finite
+        keys, scores = self.calculate_material_scores(sensor_data)
+        preservations = scores.tolist()
+        materials = dict(zip(keys, preservations))
         
         # Calculate water preservation
         water_preservation = self.calculate_water_preservation(sensor_data)
@@ -445,8 +487,8 @@ class PreservationService:
             water_preservation = 100.0
         
         # Calculate final preservation as average of all materials
-        if material_preservations:
-            final_preservation = sum(material_preservations) / len(material_preservations)
+        if preservations:
+            final_preservation = sum(preservations) / len(preservations)
             # Ensure final preservation is a valid number, not NaN
             if math.isnan(final_preservation) or math.isinf(final_preservation):
                 final_preservation = 100.0
@@ -0,0 +1,19 @@
+#!/usr/bin/env python3
+"""
+Script to train the material classifier once and persist it for the API workers
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.services.material_classification import classifier_instance, MODEL_PATH
+
+def train_model(path: str = MODEL_PATH):
+    """Train the material classifier and save it where the workers load it from"""
+    classifier_instance.train()
+    classifier_instance.save(path)
+    print(f"Saved material classifier to {path}")
+
+if __name__ == "__main__":
+    train_model(sys.argv[1] if len(sys.argv) > 1 else MODEL_PATH)